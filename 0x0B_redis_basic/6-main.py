@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+""" Testing stampede protection of the web cache on a local server """
+
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import web
+
+hits = []
+
+
+class Origin(BaseHTTPRequestHandler):
+    """ Slow page counting how often it is fetched """
+
+    def do_GET(self) -> None:
+        """ Answer after half a second """
+        hits.append(self.path)
+        time.sleep(0.5)
+        body = "page {}".format(len(hits)).encode()
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args) -> None:
+        """ Keep the output quiet """
+
+
+server = ThreadingHTTPServer(("127.0.0.1", 0), Origin)
+threading.Thread(target=server.serve_forever, daemon=True).start()
+URL: str = "http://127.0.0.1:{}/slow".format(server.server_port)
+web.set_ttl(r"/slow$", 2)
+
+
+def burst(label: str) -> None:
+    """ 50 concurrent get_page of URL """
+    pages = []
+    threads = [threading.Thread(target=lambda: pages.append(
+        web.get_page(URL))) for _ in range(50)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    print("{}: {} origin fetches, served {}".format(
+        label, len(hits), sorted(set(pages))))
+
+
+burst("cold cache")
+time.sleep(2.2)
+burst("expired, stale copy served")
+time.sleep(0.2)
+burst("refreshed")
+server.shutdown()
@@ -0,0 +1,17 @@
+#!/usr/bin/env python3
+""" Testing the sliding-window rate limiter """
+
+rate_limit = __import__('rate_limit')
+
+
+@rate_limit.rate_limit(3, 1, key=lambda email: email)
+def login(email: str) -> str:
+    """ Pretend to log email in """
+    return "logged in " + email
+
+
+for email in ["bob@dylan.com"] * 4 + ["joan@baez.com"]:
+    try:
+        print(login(email))
+    except rate_limit.RateLimited as error:
+        print(error.key, "retry after", round(error.retry_after), "s")
@@ -0,0 +1,17 @@
+#!/usr/bin/env python3
+""" Testing the sharded cache on local redis-server processes
+
+Start them first, e.g.: for port in 6380 6381 6382 6383; do
+    redis-server --port $port --daemonize yes; done
+"""
+ShardedCache = __import__('sharded').ShardedCache
+
+nodes = ["localhost:6380", "localhost:6381", "localhost:6382"]
+cache = ShardedCache(nodes)
+
+keys = cache.store_many(list(range(1000)))
+print(cache.get_int(keys[42]))
+print(cache.add_node("localhost:6383") > 0)
+print(cache.get_many(keys[:3], int))
+print(cache.remove_node("localhost:6381") > 0)
+print(cache.get_many(keys, int) == list(range(1000)))
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+    Asyncio variant of the Redis Cache
+"""
+from typing import Union, Callable, Optional
+from uuid import uuid4
+
+from exercise import Serializer
+from pool import get_async_redis
+
+
+class AsyncCache:
+    """ Cache for coroutines, on the shared pool of the event loop """
+
+    def __init__(self, serializer: Optional[Serializer] = None) -> None:
+        """
+            Constructor
+
+            Unlike Cache, the database is not flushed: a constructor
+            cannot wait for Redis, await flushdb() when that is needed.
+
+            Args:
+                serializer: encoding of the values, as for Cache
+        """
+        self._redis = get_async_redis()
+        self._serializer = serializer
+
+    async def flushdb(self) -> None:
+        """ Empty the current database """
+        await self._redis.flushdb()
+
+    async def store(self, data: Union[str, bytes, int, float]) -> str:
+        """
+            Store the data, counting and recording the call like Cache
+
+            Args:
+                data: bring the information to store
+
+            Return:
+                Key or number uuid
+        """
+        name = type(self).store.__qualname__
+        key = str(uuid4())
+        async with self._redis.pipeline() as pipe:
+            pipe.incr(name)
+            pipe.rpush(name + ":inputs", str((data,)))
+            pipe.set(key, data if self._serializer is None
+                     else self._serializer.dumps(data))
+            pipe.rpush(name + ":outputs", key)
+            await pipe.execute()
+
+        return key
+
+    async def get(self, key: str, fn: Optional[Callable] = None)\
+            -> Union[str, bytes, int, float]:
+        """
+            Get the value of a key
+
+            Args:
+                key: key returned by store
+                fn: optional conversion applied to the value
+
+            Return:
+                The stored value, converted by fn if given
+        """
+        value = await self._redis.get(key)
+        if value is not None and self._serializer is not None:
+            value = self._serializer.loads(value)
+
+        if fn:
+            return fn(value)
+
+        return value
+
+    async def get_str(self, key: str) -> str:
+        """ Parametrized get str """
+        value = await self.get(key)
+        if isinstance(value, bytes):
+            return value.decode("utf-8")
+        return value if value is None else str(value)
+
+    async def get_int(self, key: str) -> int:
+        """ Parametrized get int """
+        value = await self.get(key)
+        if isinstance(value, int):
+            return value
+        try:
+            value = int(value.decode('utf-8'))
+        except Exception:
+            value = 0
+
+        return value
+
+    async def close(self) -> None:
+        """ Give the connection back to the pool """
+        await self._redis.aclose()
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+""" Asyncio page fetcher sharing the cache and counters of web.py """
+
+import asyncio
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+from uuid import uuid4
+
+import aiohttp
+import redis
+
+import web
+from pool import get_async_redis
+
+
+class PageFetcher:
+    """
+        Fetch pages concurrently on one pooled HTTP client
+
+        Pages are cached and counted under the same keys as
+        web.get_page, with the same single-flight lock and stale copy.
+        Use it as an async context manager:
+
+            async with PageFetcher(per_host=8) as fetcher:
+                pages = await fetcher.get_pages(urls)
+    """
+
+    def __init__(self, per_host: int = 8, limit: int = 100,
+                 timeout: Optional[float] = 30.0) -> None:
+        """
+            Constructor
+
+            Args:
+                per_host: most requests in flight to one host
+                limit: most requests in flight overall
+                timeout: seconds allowed for one whole request, not
+                    counting the wait for a free per_host slot
+        """
+        self.per_host = per_host
+        self.limit = limit
+        self.timeout = timeout
+        self._session = None
+        self._redis = None
+        self._hosts: Dict[str, asyncio.Semaphore] = {}
+
+    async def __aenter__(self) -> "PageFetcher":
+        """ Open the HTTP connection pool """
+        connector = aiohttp.TCPConnector(limit=self.limit,
+                                         limit_per_host=self.per_host)
+        self._session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=self.timeout))
+        self._redis = get_async_redis()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        """ Close the HTTP connection pool """
+        await self._session.close()
+        await self._redis.aclose()
+
+    async def _fetch(self, url: str) -> str:
+        """ Body of url, from the origin """
+        host = urlsplit(url).netloc
+        slots = self._hosts.get(host)
+        if slots is None:
+            slots = self._hosts[host] = asyncio.Semaphore(self.per_host)
+        async with slots:
+            async with self._session.get(url) as response:
+                return await response.text()
+
+    async def _release(self, lock: str, token: str) -> None:
+        """ Delete the lock only while it is still the one we took """
+        async with self._redis.pipeline() as pipe:
+            try:
+                await pipe.watch(lock)
+                if await pipe.get(lock) == token.encode():
+                    pipe.multi()
+                    pipe.delete(lock)
+                    await pipe.execute()
+            except redis.WatchError:
+                pass
+
+    async def get_page(self, url: str) -> str:
+        """
+            Get page, like web.get_page without blocking the event loop
+
+            Args:
+                url: page to fetch
+
+            Return:
+                The body of the page, from the cache when fresh
+        """
+        r = self._redis
+        async with r.pipeline(transaction=False) as pipe:
+            pipe.incr(f"count:{url}")
+            pipe.get(f"cached:{url}")
+            _, cached_html = await pipe.execute()
+        if cached_html:
+            return cached_html.decode('utf-8')
+
+        lock, token = f"lock:{url}", uuid4().hex
+        if await r.set(lock, token, nx=True,
+                       px=int(web.LOCK_TIMEOUT * 1000)):
+            try:
+                html = await self._fetch(url)
+                ttl = web.ttl_for(url)
+                async with r.pipeline(transaction=False) as pipe:
+                    pipe.setex(f"cached:{url}", ttl, html)
+                    pipe.setex(f"stale:{url}", ttl + web.STALE_TTL, html)
+                    await pipe.execute()
+                return html
+            finally:
+                await self._release(lock, token)
+
+        stale_html = await r.get(f"stale:{url}")
+        if stale_html:
+            return stale_html.decode('utf-8')
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + web.LOCK_TIMEOUT
+        while loop.time() < deadline:
+            await asyncio.sleep(web.POLL_INTERVAL)
+            async with r.pipeline(transaction=False) as pipe:
+                pipe.get(f"cached:{url}")
+                pipe.exists(lock)
+                cached_html, locked = await pipe.execute()
+            if cached_html:
+                return cached_html.decode('utf-8')
+            if not locked:
+                break
+
+        return await self._fetch(url)
+
+    async def get_pages(self, urls: List[str]) -> List[str]:
+        """
+            Get several pages concurrently
+
+            Args:
+                urls: pages to fetch
+
+            Return:
+                The bodies, in the order of urls
+        """
+        return await asyncio.gather(*(self.get_page(url) for url in urls))
+
+
+async def get_pages(urls: List[str], per_host: int = 8) -> List[str]:
+    """
+        Get several pages concurrently on a fetcher of its own
+
+        Args:
+            urls: pages to fetch
+            per_host: most requests in flight to one host
+
+        Return:
+            The bodies, in the order of urls
+    """
+    async with PageFetcher(per_host=per_host) as fetcher:
+        return await fetcher.get_pages(urls)
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+""" Payload size and encode/decode throughput of the serializers
+
+"redis" is what Cache stores without a serializer: the text written by
+the client encoder, read back with the parsing get_int / get_str do.
+
+Usage: ./bench_serializers.py [rounds]
+"""
+import sys
+import time
+from typing import Any, Callable, List
+
+import redis
+
+TypedSerializer = __import__('serializers').TypedSerializer
+
+SAMPLES = [
+    ("int", 1234567890123),
+    ("float", 3.141592653589793),
+    ("short str", "holberton"),
+    ("4 KB text", "lorem ipsum dolor sit amet " * 150),
+    ("4 KB bytes", bytes(range(256)) * 16),
+]
+
+
+def rate(fn: Callable, values: List[Any], rounds: int) -> float:
+    """ Calls of fn per second over values """
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for value in values:
+            fn(value)
+    return rounds * len(values) / (time.perf_counter() - start)
+
+
+def text_parser(value: Any) -> Callable:
+    """ Parsing done by Cache.get_int / get_str for this type """
+    if isinstance(value, int):
+        return lambda data: int(data.decode("utf-8"))
+    if isinstance(value, float):
+        return lambda data: float(data.decode("utf-8"))
+    if isinstance(value, str):
+        return lambda data: data.decode("utf-8")
+    return lambda data: data
+
+
+if __name__ == "__main__":
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    encoder = redis.Redis().connection_pool.get_encoder()
+    codecs = [("redis", encoder.encode),
+              ("typed", TypedSerializer(compress_over=None)),
+              ("typed+zlib", TypedSerializer())]
+    try:
+        codecs.append(("typed+lz4", TypedSerializer(compression="lz4")))
+    except ValueError:
+        pass
+
+    print("{:>11} {:>11} {:>7} {:>12} {:>12}".format(
+        "value", "codec", "bytes", "encode/s", "decode/s"))
+    for label, value in SAMPLES:
+        for name, codec in codecs:
+            if name == "redis":
+                dumps, loads = codec, text_parser(value)
+            else:
+                dumps, loads = codec.dumps, codec.loads
+            data = dumps(value)
+            print("{:>11} {:>11} {:>7} {:>12,.0f} {:>12,.0f}".format(
+                label, name, len(data), rate(dumps, [value], rounds),
+                rate(loads, [data], rounds)))
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+""" Balance and key movement of the hash ring, against hash modulo n
+
+For 100,000 uuid4 keys: the share of the busiest node relative to a
+perfect split, then the fraction of keys that change node when a node
+is added. No Redis server is needed.
+
+Usage: ./bench_sharded.py [nodes]   (defaults to 4)
+"""
+import sys
+from collections import Counter
+from uuid import uuid4
+
+HashRing = __import__('sharded').HashRing
+
+KEYS = [str(uuid4()) for _ in range(100000)]
+
+
+def modulo(nodes: list) -> dict:
+    """ Node of each key with hash(key) % len(nodes) """
+    return {key: nodes[HashRing._hash(key) % len(nodes)] for key in KEYS}
+
+
+def ring(nodes: list, vnodes: int) -> dict:
+    """ Node of each key on a ring of nodes """
+    hash_ring = HashRing(nodes, vnodes)
+    return {key: hash_ring.node_for(key) for key in KEYS}
+
+
+def imbalance(placement: dict, count: int) -> float:
+    """ Keys of the busiest node over the keys of a perfect split """
+    return max(Counter(placement.values()).values()) * count / len(KEYS)
+
+
+def moved(before: dict, after: dict) -> float:
+    """ Fraction of keys that changed node """
+    return sum(before[key] != after[key] for key in KEYS) / len(KEYS)
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    nodes = ["localhost:{}".format(6379 + n) for n in range(count + 1)]
+    print("{} -> {} nodes, ideal move {:.1%}".format(
+        count, count + 1, 1 / (count + 1)))
+    before, after = modulo(nodes[:-1]), modulo(nodes)
+    print("{:>16} busiest={:.2f}x moved={:6.1%}".format(
+        "hash % n", imbalance(before, count), moved(before, after)))
+    for vnodes in (1, 10, 40, 160, 640):
+        before, after = ring(nodes[:-1], vnodes), ring(nodes, vnodes)
+        print("{:>16} busiest={:.2f}x moved={:6.1%}".format(
+            "ring vnodes={}".format(vnodes), imbalance(before, count),
+            moved(before, after)))
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+""" Store latency with one round trip per command against pipelining
+
+LegacyCache keeps the decorators as they were before pipelining: INCR,
+RPUSH, SET and RPUSH each cost a round trip. "lua script" sends the
+same commands as one EVALSHA instead of MULTI/EXEC. The store_many rows
+give the time per value of batches sent as one MSET, the "lua many"
+rows the same batches on a scripted cache, 5000 values going over
+SCRIPT_MAX_WORDS. Round trips are counted on the connections, and the
+history of every cache is checked to stay paired.
+
+Usage: ./bench_store.py [--fake] [stores]
+    --fake  run against fakeredis instead of the local redis-server
+"""
+import functools
+import sys
+import time
+from typing import Callable, List, Union
+from uuid import uuid4
+
+import redis
+
+
+if "--fake" in sys.argv:
+    import fakeredis
+    __import__('pool').configure(
+        connection_class=fakeredis.FakeRedisConnection,
+        server=fakeredis.FakeServer())
+
+Cache = __import__('exercise').Cache
+
+round_trips = 0
+_send = redis.connection.AbstractConnection.send_packed_command
+
+
+def counted_send(self, *args, **kwargs) -> None:
+    """ send_packed_command, counting the round trips """
+    global round_trips
+
+    round_trips += 1
+    return _send(self, *args, **kwargs)
+
+
+redis.connection.AbstractConnection.send_packed_command = counted_send
+
+
+def legacy_count_calls(method: Callable) -> Callable:
+    """ count_calls sending its own INCR """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        """ Wrapper method """
+        self._redis.incr(method.__qualname__)
+        return method(self, *args, **kwargs)
+    return wrapper
+
+
+def legacy_call_history(method: Callable) -> Callable:
+    """ call_history sending its own RPUSH commands """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        """ Wrapper method """
+        self._redis.rpush(method.__qualname__ + ":inputs", str(args))
+        output = str(method(self, *args, **kwargs))
+        self._redis.rpush(method.__qualname__ + ":outputs", output)
+        return output
+    return wrapper
+
+
+class LegacyCache(Cache):
+    """ Cache with the unpipelined decorators """
+
+    @legacy_call_history
+    @legacy_count_calls
+    def store(self, data: Union[str, bytes, int, float]) -> str:
+        """ Store data under a new key """
+        key = str(uuid4())
+        self._redis.set(key, data)
+        return key
+
+
+def report(label: str, samples: List[float], calls: int, trips: int)\
+        -> None:
+    """ Print mean and p99 latency and round trips per call """
+    samples.sort()
+    print("{:>18} mean={:7.1f}us p99={:7.1f}us round trips={:5.2f}".format(
+        label, sum(samples) / len(samples) * 1e6,
+        samples[int(len(samples) * 0.99)] * 1e6, trips / calls))
+
+
+def latencies(cache: Cache, stores: int) -> List[float]:
+    """ Time stores calls of cache.store """
+    samples = []
+    for n in range(stores):
+        start = time.perf_counter()
+        cache.store(n)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def batch_latencies(cache: Cache, stores: int, batch: int) -> List[float]:
+    """ Time per value of cache.store_many over batches of batch values """
+    samples = []
+    for n in range(0, stores, batch):
+        start = time.perf_counter()
+        cache.store_many(list(range(n, n + batch)))
+        samples.append((time.perf_counter() - start) / batch)
+    return samples
+
+
+def check_history(cache: Cache) -> None:
+    """ Exit when the inputs, outputs and count of a method disagree """
+    for method in ("Cache.store", "Cache.store_many"):
+        lengths = {cache._redis.llen(method + ":inputs"),
+                   cache._redis.llen(method + ":outputs"),
+                   int(cache._redis.get(method) or 0)}
+        if len(lengths) != 1:
+            sys.exit("{} history out of step: {}".format(method, lengths))
+
+
+if __name__ == "__main__":
+    args = [arg for arg in sys.argv[1:] if arg != "--fake"]
+    stores = int(args[0]) if args else 10000
+
+    caches = [("unpipelined", LegacyCache()),
+              ("pipelined", Cache()),
+              ("lua script", Cache(scripted=True)),
+              ("buffered counters", Cache(buffer_counters=True))]
+    for label, cache in caches:
+        before = round_trips
+        samples = latencies(cache, stores)
+        report(label, samples, stores, round_trips - before)
+        cache.flush()
+        check_history(cache)
+    for batch in (10, 100, 1000, 5000):
+        for label, scripted in (("store_many", False), ("lua many", True)):
+            cache = Cache(scripted=scripted)
+            before = round_trips
+            samples = batch_latencies(cache, stores, batch)
+            report("{}({})".format(label, batch), samples, stores,
+                   round_trips - before)
+            check_history(cache)
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+""" Read latency of Cache against TieredCache
+
+Usage: ./bench_tiered.py [--fake] [reads]
+    --fake  run against fakeredis instead of the local redis-server
+"""
+import random
+import sys
+import time
+from typing import List
+
+
+if "--fake" in sys.argv:
+    import fakeredis
+    __import__('pool').configure(
+        connection_class=fakeredis.FakeRedisConnection,
+        server=fakeredis.FakeServer())
+
+Cache = __import__('exercise').Cache
+TieredCache = __import__('tiered').TieredCache
+
+
+def percentiles(samples: List[float]) -> str:
+    """ p50 / p99 / max of samples in microseconds """
+    samples = sorted(samples)
+    return "p50={:8.1f}us p99={:8.1f}us max={:8.1f}us".format(
+        samples[len(samples) // 2] * 1e6,
+        samples[int(len(samples) * 0.99)] * 1e6,
+        samples[-1] * 1e6)
+
+
+def read_latencies(cache: Cache, keys: List[str], reads: int) -> List[float]:
+    """ Time reads of keys drawn with a skewed distribution """
+    rng = random.Random(0)
+    weights = [1 / (rank + 1) for rank in range(len(keys))]
+    samples = []
+    for key in rng.choices(keys, weights=weights, k=reads):
+        start = time.perf_counter()
+        cache.get(key)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+if __name__ == "__main__":
+    args = [arg for arg in sys.argv[1:] if arg != "--fake"]
+    reads = int(args[0]) if args else 20000
+
+    for cache in (Cache(), TieredCache(max_items=1000)):
+        keys = [cache.store("value {}".format(n)) for n in range(2000)]
+        samples = read_latencies(cache, keys, reads)
+        print("{:>12} {}".format(type(cache).__name__, percentiles(samples)))
+        if isinstance(cache, TieredCache):
+            cache.close()
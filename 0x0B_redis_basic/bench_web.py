@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+""" Time to fetch 1,000 uncached pages: web.get_page against PageFetcher
+
+The origin is a local http.server in another process answering every
+page after a short delay, with keep-alive so connection reuse counts.
+
+Usage: ./bench_web.py [--fake] [pages] [delay_ms]
+    --fake  run against fakeredis instead of the local redis-server
+"""
+import asyncio
+import multiprocessing
+import sys
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+if "--fake" in sys.argv:
+    import fakeredis
+    __import__('pool').configure(
+        connection_class=fakeredis.FakeRedisConnection,
+        async_connection_class=fakeredis.FakeAsyncRedisConnection,
+        server=fakeredis.FakeServer())
+
+web = __import__('web')
+PageFetcher = __import__('async_web').PageFetcher
+
+
+def serve(port: int, delay: float) -> None:
+    """ Run the origin server on port """
+
+    class Origin(BaseHTTPRequestHandler):
+        """ Page answered after delay seconds """
+        protocol_version = "HTTP/1.1"
+        # headers and body are two writes: without this, Nagle and
+        # delayed ACKs add 40ms to every keep-alive response
+        disable_nagle_algorithm = True
+
+        def do_GET(self) -> None:
+            """ Answer with a small page """
+            time.sleep(delay)
+            body = ("<p>" + self.path + "</p>").encode() * 50
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args) -> None:
+            """ Keep the output quiet """
+
+    ThreadingHTTPServer(("127.0.0.1", port), Origin).serve_forever()
+
+
+async def fetch_async(urls: list, per_host: int) -> None:
+    """ Fetch urls with one PageFetcher """
+    async with PageFetcher(per_host=per_host) as fetcher:
+        await fetcher.get_pages(urls)
+
+
+if __name__ == "__main__":
+    args = [arg for arg in sys.argv[1:] if arg != "--fake"]
+    pages = int(args[0]) if args else 1000
+    delay = (float(args[1]) if len(args) > 1 else 5) / 1000
+    port = 8765
+    origin = multiprocessing.Process(target=serve, args=(port, delay),
+                                     daemon=True)
+    origin.start()
+    time.sleep(0.5)
+
+    runs = [("web.get_page", None)] + [
+        ("PageFetcher per_host={}".format(n), n) for n in (1, 8, 32)]
+    for n, (label, per_host) in enumerate(runs):
+        urls = ["http://127.0.0.1:{}/{}/{}".format(port, n, page)
+                for page in range(pages)]
+        start = time.perf_counter()
+        if per_host is None:
+            for url in urls:
+                web.get_page(url)
+        else:
+            asyncio.run(fetch_async(urls, per_host))
+        elapsed = time.perf_counter() - start
+        print("{:>22} {:7.2f}s {:8.0f} pages/s".format(
+            label, elapsed, pages / elapsed))
+    origin.terminate()
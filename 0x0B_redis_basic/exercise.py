@@ -2,11 +2,219 @@
 """
     String Redis
 """
+import atexit
+import json
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
 from uuid import uuid4
-from typing import Union, Callable
+from typing import Union, Callable, Iterator, List, Optional, TextIO
 from functools import wraps
 import redis
 
+from pool import get_redis
+
+
+class Serializer:
+    """
+        What Cache needs from a serializer: any object with these two
+        methods will do, subclassing is not required
+    """
+
+    def dumps(self, value: Union[str, bytes, int, float]) -> bytes:
+        """ Encode a value for Redis """
+        raise NotImplementedError("dumps must be implemented")
+
+    def loads(self, data: bytes) -> Union[str, bytes, int, float]:
+        """ Decode a value read from Redis """
+        raise NotImplementedError("loads must be implemented")
+
+
+class CounterBuffer:
+    """ Counters kept in memory and flushed to Redis in batches """
+
+    def __init__(self, client: redis.Redis, interval: float = 1.0) -> None:
+        """
+            Constructor
+
+            Args:
+                client: Redis client receiving the counts
+                interval: seconds between two background flushes
+        """
+        self._client = client
+        self._counts: Counter = Counter()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        threading.Thread(target=self._run, args=(interval,),
+                         daemon=True).start()
+        atexit.register(self.close)
+
+    def incr(self, name: str, field: Optional[str] = None,
+             amount: int = 1) -> None:
+        """
+            Add to a counter
+
+            Args:
+                name: key of the counter
+                field: field of the hash name holding the counter, the
+                    key itself is the counter when None
+                amount: value added
+        """
+        with self._lock:
+            self._counts[name, field] += amount
+
+    def flush(self) -> None:
+        """ Send the pending counts in one pipeline of INCRBY/HINCRBY """
+        with self._lock:
+            counts, self._counts = self._counts, Counter()
+        if not counts:
+            return
+        pipe = self._client.pipeline(transaction=False)
+        for (name, field), count in counts.items():
+            if field is None:
+                pipe.incrby(name, count)
+            else:
+                pipe.hincrby(name, field, count)
+        try:
+            pipe.execute()
+        except redis.RedisError:
+            # keep the counts for the next flush
+            with self._lock:
+                self._counts.update(counts)
+            raise
+
+    def _run(self, interval: float) -> None:
+        """ Flush every interval seconds until closed """
+        while not self._stop.wait(interval):
+            try:
+                self.flush()
+            except redis.RedisError:
+                pass
+
+    def close(self) -> None:
+        """ Stop the background flushes after a last one """
+        self._stop.set()
+        self.flush()
+
+
+# longest command, in words, run by RUN_COMMANDS: unpack() puts every
+# word on the Lua stack, limited to about 8000 slots
+SCRIPT_MAX_WORDS = 4000
+
+# ARGV holds the queued commands back to back, each one preceded by
+# its number of words: n1, cmd1, args1..., n2, cmd2, args2... Scripts
+# are not rolled back, so the framing is checked before any write.
+RUN_COMMANDS = """
+local i = 1
+while i <= #ARGV do
+    local n = tonumber(ARGV[i])
+    if n == nil or n < 1 or n > %d or i + n > #ARGV then
+        return redis.error_reply('malformed command at word ' .. i)
+    end
+    i = i + n + 1
+end
+i = 1
+local count = 0
+while i <= #ARGV do
+    local n = tonumber(ARGV[i])
+    redis.call(unpack(ARGV, i + 1, i + n))
+    i = i + n + 1
+    count = count + 1
+end
+return count
+""" % SCRIPT_MAX_WORDS
+
+
+class ScriptPipeline(redis.commands.CoreCommands):
+    """
+        Pipeline running its commands in one EVALSHA of RUN_COMMANDS:
+        one server-side execution, with no MULTI/EXEC framing. Keys are
+        not declared to the script, which suits a single Redis server
+        but not Redis Cluster. Batches holding a command longer than
+        SCRIPT_MAX_WORDS, e.g. a large MSET, run as MULTI/EXEC instead.
+    """
+
+    def __init__(self, script: redis.commands.core.Script) -> None:
+        """
+            Constructor
+
+            Args:
+                script: RUN_COMMANDS registered on the client
+        """
+        self._script = script
+        self._words = []
+        self._longest = 0
+
+    def execute_command(self, *args, **options) -> "ScriptPipeline":
+        """ Queue a command, called by every command method """
+        self._words.append(len(args))
+        self._words.extend(args)
+        self._longest = max(self._longest, len(args))
+        return self
+
+    def execute(self) -> int:
+        """
+            Run the queued commands
+
+            Return:
+                Number of commands run
+        """
+        if not self._words:
+            return 0
+        words, self._words = self._words, []
+        longest, self._longest = self._longest, 0
+        if longest > SCRIPT_MAX_WORDS:
+            return self._transaction(words)
+        return self._script(args=words)
+
+    def _transaction(self, words: list) -> int:
+        """ Run the commands of words on one MULTI/EXEC pipeline """
+        pipe = self._script.registered_client.pipeline()
+        count = 0
+        i = 0
+        while i < len(words):
+            n = words[i]
+            pipe.execute_command(*words[i + 1:i + n + 1])
+            i += n + 1
+            count += 1
+        pipe.execute()
+        return count
+
+
+@contextmanager
+def batched(cache: "Cache") -> Iterator[redis.client.Pipeline]:
+    """
+        Queue the Redis commands of one call on a single MULTI/EXEC
+        pipeline, or a ScriptPipeline for a scripted cache, sent when
+        the outermost decorator returns. Nested decorators and the
+        method itself reuse the same pipeline.
+
+        Args:
+            cache: instance whose call is being recorded
+
+        Return:
+            The pipeline to queue commands on
+    """
+    pipe = getattr(cache._calls, "pipe", None)
+    if pipe is not None:
+        yield pipe
+        return
+
+    if cache._script is None:
+        pipe = cache._redis.pipeline()
+    else:
+        pipe = ScriptPipeline(cache._script)
+    cache._calls.pipe = pipe
+    try:
+        yield pipe
+    finally:
+        cache._calls.pipe = None
+    pipe.execute()
+
 
 def count_calls(method: Callable = None) -> Callable:
     """ Decorator count calls """
@@ -15,33 +223,200 @@ def count_calls(method: Callable = None) -> Callable:
     @wraps(method)
     def wrapper(self, *args, **kwargs):
         """ Wrapper method """
-        self._redis.incr(name)
-        return method(self, *args, **kwargs)
+        if self._counters is not None:
+            self._counters.incr(name)
+            return method(self, *args, **kwargs)
+
+        with batched(self) as pipe:
+            pipe.incr(name)
+            return method(self, *args, **kwargs)
 
     return wrapper
 
 
-def call_history(method: Callable) -> Callable:
-    """ Decorator call history """
+# upper bounds of the latency buckets of metered, in microseconds
+LATENCY_BUCKETS = (100, 250, 500, 1000, 2500, 5000, 10000, 25000, 50000,
+                   100000, 250000, 1000000)
+METRICS_KEY = "metrics"
+
+
+def latency_field(elapsed: float) -> str:
+    """ Hash field of the latency bucket of elapsed seconds """
+    micros = elapsed * 1e6
+    for bound in LATENCY_BUCKETS:
+        if micros <= bound:
+            return "le:{}".format(bound)
+    return "le:inf"
+
+
+def metered(method: Callable = None) -> Callable:
+    """
+        Decorator recording calls, errors and a latency histogram of a
+        method in the hash metrics:{qualname}, listed in the hash
+        metrics, on caches built with metrics=True. Updates are summed
+        in memory and sent with HINCRBY in the background, so a call
+        costs no round trip; put it outermost so the latency includes
+        the pipeline of the other decorators.
+    """
+    name = method.__qualname__
+    key = METRICS_KEY + ":" + name
 
     @wraps(method)
     def wrapper(self, *args, **kwargs):
-        """ Wraper function """
-        input: str = str(args)
-        self._redis.rpush(method.__qualname__ + ":inputs", input)
+        """ Wrapper method """
+        metrics = self._metrics
+        if metrics is None:
+            return method(self, *args, **kwargs)
+
+        start = time.perf_counter()
+        try:
+            return method(self, *args, **kwargs)
+        except Exception:
+            metrics.incr(key, "errors")
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            metrics.incr(METRICS_KEY, name)
+            metrics.incr(key, "calls")
+            metrics.incr(key, "sum_us", int(elapsed * 1e6))
+            metrics.incr(key, latency_field(elapsed))
+
+    return wrapper
+
 
-        output = str(method(self, *args, **kwargs))
-        self._redis.rpush(method.__qualname__ + ":outputs", output)
+def compact_args(args: tuple) -> str:
+    """ Compact JSON encoding of call arguments, repr() for the rest """
+    return json.dumps(args, separators=(",", ":"), default=repr)
+
+
+def call_history(method: Callable = None, *, max_len: Optional[int] = None,
+                 max_age: Optional[float] = None, sample_rate: float = 1.0,
+                 encoder: Callable[[tuple], str] = str,
+                 stream: bool = False) -> Callable:
+    """
+        Decorator call history, usable bare or with options
+
+        Args:
+            max_len: keep only the last max_len calls (LTRIM on the
+                lists, approximate MAXLEN on a stream)
+            max_age: drop entries older than max_age seconds (XTRIM
+                MINID); needs stream, lists only keep their last
+                max_len calls
+            sample_rate: fraction of the calls recorded
+            encoder: turns the args tuple into the stored input,
+                e.g. compact_args instead of str
+            stream: record each call as one {name}:history stream entry
+                holding its input and output, instead of the
+                {name}:inputs and {name}:outputs lists
+    """
+    if max_age is not None and not stream:
+        raise ValueError("max_age needs a history recorded as a stream")
+    if method is None:
+        return lambda method: call_history(
+            method, max_len=max_len, max_age=max_age,
+            sample_rate=sample_rate, encoder=encoder, stream=stream)
 
-        return output
+    name = method.__qualname__
+
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        """ Wraper function """
+        if sample_rate < 1 and random.random() >= sample_rate:
+            return method(self, *args, **kwargs)
+
+        with batched(self) as pipe:
+            input: str = encoder(args)
+            if not stream:
+                pipe.rpush(name + ":inputs", input)
+
+            result = method(self, *args, **kwargs)
+            output = str(result)
+            if stream:
+                pipe.xadd(name + ":history",
+                          {"input": input, "output": output},
+                          maxlen=max_len, approximate=True)
+                if max_age is not None:
+                    oldest = int((time.time() - max_age) * 1000)
+                    pipe.xtrim(name + ":history", minid=oldest,
+                               approximate=True)
+            else:
+                pipe.rpush(name + ":outputs", output)
+                if max_len is not None:
+                    pipe.ltrim(name + ":inputs", -max_len, -1)
+                    pipe.ltrim(name + ":outputs", -max_len, -1)
+
+        return result
 
     return wrapper
 
 
-def replay(func: Callable):
-    """ Replay function """
-    r = redis.Redis()
+def _decode(value: bytes) -> str:
+    """ UTF-8 text of a stored value, empty when it cannot be decoded """
+    try:
+        return value.decode('utf-8')
+    except Exception:
+        return ""
+
+
+def _list_history(r: redis.Redis, func_name: str,
+                  chunk: int) -> Iterator[tuple]:
+    """ (input, output) pairs of the history lists, chunk by chunk """
+    start = 0
+    while True:
+        pipe = r.pipeline(transaction=False)
+        pipe.lrange(func_name + ":inputs", start, start + chunk - 1)
+        pipe.lrange(func_name + ":outputs", start, start + chunk - 1)
+        ins, outs = pipe.execute()
+        yield from zip(ins, outs)
+        if len(ins) < chunk:
+            return
+        start += chunk
+
+
+def _stream_history(r: redis.Redis, func_name: str, chunk: int,
+                    since: Optional[float],
+                    until: Optional[float]) -> Iterator[tuple]:
+    """ (input, output) pairs of the history stream, chunk by chunk """
+    low = "-" if since is None else str(int(since * 1000))
+    high = "+" if until is None else str(int(until * 1000))
+    while True:
+        entries = r.xrange(func_name + ":history", min=low, max=high,
+                           count=chunk)
+        for _, fields in entries:
+            yield fields[b"input"], fields[b"output"]
+        if len(entries) < chunk:
+            return
+        low = "(" + entries[-1][0].decode()
+
+
+def replay(func: Callable, sink: Optional[TextIO] = None, chunk: int = 1000,
+           since: Optional[float] = None, until: Optional[float] = None,
+           pattern: Optional[str] = None) -> None:
+    """
+        Replay function, streaming the history chunk by chunk
+
+        Args:
+            func: recorded method, e.g. cache.store
+            sink: file-like object written to, sys.stdout by default
+            chunk: number of calls fetched per round trip
+            since, until: only calls in this range of epoch seconds;
+                needs a history recorded with stream=True
+            pattern: only calls whose input matches this regex
+    """
+    sink = sys.stdout if sink is None else sink
     func_name = func.__qualname__
+    owner = getattr(func, "__self__", None)
+    if isinstance(owner, Cache):
+        owner.flush()
+        r = owner._redis
+    else:
+        r = get_redis()
+    # check the filters before anything is written to the sink
+    stream = r.type(func_name + ":history") == b"stream"
+    if not stream and (since is not None or until is not None):
+        raise ValueError("time filters need a history recorded as a stream")
+    match = re.compile(pattern).search if pattern else None
+
     number_calls = r.get(func_name)
 
     try:
@@ -49,32 +424,102 @@ def replay(func: Callable):
     except Exception:
         number_calls = 0
 
-    print(f'{func_name} was called {number_calls} times:')
+    print(f'{func_name} was called {number_calls} times:', file=sink)
 
-    ins = r.lrange(func_name + ":inputs", 0, -1)
-    outs = r.lrange(func_name + ":outputs", 0, -1)
+    if stream:
+        calls = _stream_history(r, func_name, chunk, since, until)
+    else:
+        calls = _list_history(r, func_name, chunk)
 
-    for cin, cout in zip(ins, outs):
-        try:
-            cin = cin.decode('utf-8')
-        except Exception:
-            cin = ""
-        try:
-            cout = cout.decode('utf-8')
-        except Exception:
-            cout = ""
-
-        print(f'{func_name}(*{cin}) -> {cout}')
+    for cin, cout in calls:
+        cin, cout = _decode(cin), _decode(cout)
+        if match is None or match(cin):
+            print(f'{func_name}(*{cin}) -> {cout}', file=sink)
 
 
 class Cache:
     """ Functionality Redis """
 
-    def __init__(self):
-        """ Constructor """
-        self._redis = redis.Redis()
-        self._redis.flushdb()
+    def __init__(self, buffer_counters: bool = False,
+                 flush_interval: float = 1.0,
+                 serializer: Optional[Serializer] = None,
+                 scripted: bool = False, flush: bool = True,
+                 client: Optional[redis.Redis] = None,
+                 metrics: bool = False) -> None:
+        """
+            Constructor
 
+            Args:
+                buffer_counters: count calls locally and flush the
+                    counters every flush_interval seconds instead of
+                    sending an INCR with each call
+                flush_interval: seconds between two counter flushes
+                serializer: object with dumps/loads, e.g. a
+                    serializers.TypedSerializer, so that get returns
+                    values with the type they were stored with
+                scripted: run the commands of each recorded call
+                    (count, history, writes of the method) as one
+                    server-side Lua script instead of MULTI/EXEC
+                flush: empty the database first, as the exercise
+                    expects; pass False on a server shared with others
+                client: server of the cache, the shared pool when None
+                metrics: record the calls of metered methods, flushed
+                    every flush_interval seconds like buffered counters
+        """
+        self._redis = get_redis() if client is None else client
+        self._serializer = serializer
+        self._script = None
+        if scripted:
+            self._script = self._redis.register_script(RUN_COMMANDS)
+        if flush:
+            self._redis.flushdb()
+        self._calls = threading.local()
+        self._counters = None
+        if buffer_counters:
+            self._counters = CounterBuffer(self._redis, flush_interval)
+        self._metrics = None
+        if metrics:
+            self._metrics = self._counters or \
+                CounterBuffer(self._redis, flush_interval)
+
+    def _writer(self, key: Optional[str] = None)\
+            -> Union[redis.Redis, redis.client.Pipeline, ScriptPipeline]:
+        """ Pipeline of the call being recorded, else the client """
+        pipe = getattr(self._calls, "pipe", None)
+        return self._redis if pipe is None else pipe
+
+    def _reader(self, key: str) -> redis.Redis:
+        """ Client of the server holding key """
+        return self._redis
+
+    def _mset(self, mapping: dict) -> None:
+        """ Write several keys, on the pipeline of the call if any """
+        self._writer().mset(mapping)
+
+    def _mget(self, keys: List[str]) -> List[Optional[bytes]]:
+        """ Raw values of several keys, in order """
+        return self._redis.mget(keys)
+
+    def _dumps(self, data: Union[str, bytes, int, float]) -> bytes:
+        """ Value as written to Redis """
+        if self._serializer is None:
+            return data
+        return self._serializer.dumps(data)
+
+    def _loads(self, value: Optional[bytes]) -> Union[str, bytes, int, float]:
+        """ Value as returned to the caller """
+        if value is None or self._serializer is None:
+            return value
+        return self._serializer.loads(value)
+
+    def flush(self) -> None:
+        """ Send the locally buffered call counters and metrics, if any """
+        if self._counters is not None:
+            self._counters.flush()
+        if self._metrics is not None and self._metrics is not self._counters:
+            self._metrics.flush()
+
+    @metered
     @call_history
     @count_calls
     def store(self, data: Union[str, bytes, int, float]) -> str:
@@ -88,10 +533,31 @@ class Cache:
                 Key or number uuid
         """
         key = str(uuid4())
-        self._redis.set(key, data)
+        self._writer(key).set(key, self._dumps(data))
 
         return key
 
+    @metered
+    @call_history
+    @count_calls
+    def store_many(self, values: List[Union[str, bytes, int, float]])\
+            -> List[str]:
+        """
+            Store several values with one MSET, recorded as one call
+
+            Args:
+                values: bring the information to store
+
+            Return:
+                Keys of the values, in the same order
+        """
+        keys = [str(uuid4()) for _ in values]
+        if keys:
+            self._mset({key: self._dumps(value)
+                        for key, value in zip(keys, values)})
+
+        return keys
+
     def get(self, key: str, fn: Callable = None)\
             -> Union[str, bytes, int, float]:
         """
@@ -103,20 +569,46 @@ class Cache:
             Return:
                 Key or number uuid
         """
-        key = self._redit.get(key)
+        key = self._loads(self._reader(key).get(key))
 
         if fn:
             return fn(key)
 
         return key
 
+    def get_many(self, keys: List[str], fn: Callable = None)\
+            -> List[Union[str, bytes, int, float]]:
+        """
+            Get several values with one MGET
+
+            Args:
+                keys: keys returned by store or store_many
+                fn: optional conversion applied to each value
+
+            Return:
+                The values in the order of keys, None for missing ones
+        """
+        if not keys:
+            return []
+        values = [self._loads(value) for value in self._mget(keys)]
+
+        if fn:
+            return [fn(value) for value in values]
+
+        return values
+
     def get_str(self, key: str) -> str:
         """ Parametrized get str """
-        return self._redit.get(key).decode("utf-8")
+        value = self.get(key)
+        if isinstance(value, bytes):
+            return value.decode("utf-8")
+        return value if value is None else str(value)
 
     def get_int(self, key: str) -> int:
         """ Parametrized get int """
-        value = self._redis.get(key)
+        value = self.get(key)
+        if isinstance(value, int):
+            return value
         try:
             value = int(value.decode('utf-8'))
         except Exception:
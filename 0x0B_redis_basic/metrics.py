@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+    Snapshots and Prometheus export of the metrics of metered methods
+"""
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+
+import redis
+
+from pool import get_redis
+
+exercise = __import__('exercise')
+LATENCY_BUCKETS = exercise.LATENCY_BUCKETS
+METRICS_KEY = exercise.METRICS_KEY
+
+
+def snapshot(client: Optional[redis.Redis] = None) -> dict:
+    """
+        Read the metrics of every metered method in one round trip
+
+        Pending updates of a cache are sent by its flush() first.
+
+        Args:
+            client: server holding the metrics, the shared pool when None
+
+        Return:
+            {"time": epoch seconds, "methods": {qualname: {"calls",
+            "errors", "sum_seconds", "buckets": [(le seconds,
+            cumulative count)...] ending with (inf, calls)}}}
+    """
+    client = get_redis() if client is None else client
+    names = sorted(name.decode() for name in client.hkeys(METRICS_KEY))
+    pipe = client.pipeline(transaction=False)
+    for name in names:
+        pipe.hgetall(METRICS_KEY + ":" + name)
+    methods = {}
+    for name, fields in zip(names, pipe.execute()):
+        fields = {field.decode(): int(value)
+                  for field, value in fields.items()}
+        buckets, total = [], 0
+        for bound in LATENCY_BUCKETS:
+            total += fields.get("le:{}".format(bound), 0)
+            buckets.append((bound / 1e6, total))
+        buckets.append((float("inf"), total + fields.get("le:inf", 0)))
+        methods[name] = {
+            "calls": fields.get("calls", 0),
+            "errors": fields.get("errors", 0),
+            "sum_seconds": fields.get("sum_us", 0) / 1e6,
+            "buckets": buckets,
+        }
+    return {"time": time.time(), "methods": methods}
+
+
+def rates(before: dict, after: dict) -> Dict[str, float]:
+    """
+        Calls per second of each method between two snapshots
+
+        Args:
+            before, after: results of snapshot, in that order
+
+        Return:
+            {qualname: calls per second}
+    """
+    elapsed = after["time"] - before["time"]
+    if elapsed <= 0:
+        return {}
+    per_second = {}
+    for name, stats in after["methods"].items():
+        previous = before["methods"].get(name, {}).get("calls", 0)
+        per_second[name] = (stats["calls"] - previous) / elapsed
+    return per_second
+
+
+def _bound(seconds: float) -> str:
+    """ Prometheus spelling of a bucket bound """
+    return "+Inf" if seconds == float("inf") else repr(seconds)
+
+
+def prometheus_text(metrics: Optional[dict] = None) -> str:
+    """
+        Metrics in the Prometheus text exposition format
+
+        Args:
+            metrics: a snapshot, taken now when None
+
+        Return:
+            The calls, errors and latency histogram of every method
+    """
+    methods = (snapshot() if metrics is None else metrics)["methods"]
+    lines: List[str] = [
+        "# HELP cache_calls_total Calls of a metered cache method.",
+        "# TYPE cache_calls_total counter"]
+    lines += ['cache_calls_total{{method="{}"}} {}'.format(
+        name, stats["calls"]) for name, stats in methods.items()]
+    lines += [
+        "# HELP cache_errors_total Calls that raised an exception.",
+        "# TYPE cache_errors_total counter"]
+    lines += ['cache_errors_total{{method="{}"}} {}'.format(
+        name, stats["errors"]) for name, stats in methods.items()]
+    lines += [
+        "# HELP cache_call_duration_seconds Latency of the calls.",
+        "# TYPE cache_call_duration_seconds histogram"]
+    for name, stats in methods.items():
+        for bound, count in stats["buckets"]:
+            lines.append('cache_call_duration_seconds_bucket{{method="{}",'
+                         'le="{}"}} {}'.format(name, _bound(bound), count))
+        lines.append('cache_call_duration_seconds_sum{{method="{}"}} {}'
+                     .format(name, stats["sum_seconds"]))
+        lines.append('cache_call_duration_seconds_count{{method="{}"}} {}'
+                     .format(name, stats["calls"]))
+    return "\n".join(lines) + "\n"
+
+
+def serve(port: int = 9100, host: str = "") -> ThreadingHTTPServer:
+    """
+        Serve prometheus_text() on /metrics from a background thread
+
+        Args:
+            port, host: address to listen on
+
+        Return:
+            The running server, stopped by its shutdown()
+    """
+    class Handler(BaseHTTPRequestHandler):
+        """ Answer GET /metrics """
+
+        def do_GET(self) -> None:
+            """ Send the current metrics """
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = prometheus_text().encode()
+            self.send_response(200)
+            self.send_header("Content-Type",
+                             "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args) -> None:
+            """ Keep the output quiet """
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+    Shared Redis connection pools for the caches of this project
+"""
+import asyncio
+import threading
+import weakref
+from types import ModuleType
+from typing import Optional
+
+import redis
+import redis.asyncio
+
+_lock = threading.RLock()
+_settings = {}
+_clients = {}
+_async_pools = weakref.WeakKeyDictionary()
+
+
+def configure(size: int = 50, timeout: Optional[float] = None,
+              connect_timeout: Optional[float] = None,
+              wait: Optional[float] = 5.0,
+              unix_socket: Optional[str] = None,
+              connection_class: Optional[type] = None,
+              async_connection_class: Optional[type] = None,
+              **connection_kwargs) -> None:
+    """
+        Set the options of the shared pools, replacing the current ones
+
+        Clients handed out before the call keep their old pool.
+
+        Args:
+            size: most connections opened by one pool
+            timeout: seconds a command may wait for its reply
+            connect_timeout: seconds a connection may take to open
+            wait: seconds to wait for a free connection once size are
+                in use, before raising ConnectionError (None waits
+                forever)
+            unix_socket: path of the server socket, instead of TCP
+            connection_class, async_connection_class: connection types
+                of the sync and asyncio pools, to override the default
+                TCP or Unix socket ones
+            connection_kwargs: host, port, db, password... of the server
+    """
+    options = dict(connection_kwargs, max_connections=size, timeout=wait,
+                   socket_timeout=timeout,
+                   socket_connect_timeout=connect_timeout)
+    with _lock:
+        _settings.clear()
+        _settings["options"] = options
+        _settings["unix_socket"] = unix_socket
+        _settings[redis] = connection_class
+        _settings[redis.asyncio] = async_connection_class
+        _clients.clear()
+        _async_pools.clear()
+
+
+def _options(flavour: ModuleType, node: Optional[str] = None) -> dict:
+    """
+        Options of a pool of the redis or redis.asyncio flavour, for the
+        configured server or for a "host:port[/db]" or unix socket node
+    """
+    if not _settings:
+        configure()
+    options = dict(_settings["options"])
+    unix_socket = _settings["unix_socket"]
+    if node is not None:
+        unix_socket = None
+        if node.startswith("/"):
+            unix_socket = node
+        else:
+            address, _, db = node.partition("/")
+            host, _, port = address.rpartition(":")
+            options.update(host=host or "localhost", port=int(port))
+            if db:
+                options["db"] = int(db)
+    connection_class = _settings[flavour]
+    if unix_socket is not None:
+        options["path"] = unix_socket
+        connection_class = connection_class or \
+            flavour.UnixDomainSocketConnection
+    if connection_class is not None:
+        options["connection_class"] = connection_class
+    return options
+
+
+def get_redis(node: Optional[str] = None) -> redis.Redis:
+    """
+        Client of the shared pool
+
+        Args:
+            node: "host:port", "host:port/db" or the path of a unix
+                socket, for a pool of that server built with the same
+                options; the configured server when None
+
+        Return:
+            The same thread-safe redis.Redis for every caller, until
+            configure is called again
+    """
+    with _lock:
+        client = _clients.get(node)
+        if client is None:
+            pool = redis.BlockingConnectionPool(**_options(redis, node))
+            client = _clients[node] = redis.Redis(connection_pool=pool)
+        return client
+
+
+def get_async_redis() -> redis.asyncio.Redis:
+    """
+        Asyncio client of the shared pool of the running event loop
+
+        asyncio connections cannot move between event loops, so every
+        loop gets its own pool, built from the same options.
+
+        Return:
+            A redis.asyncio.Redis sharing the pool of its loop
+    """
+    loop = asyncio.get_running_loop()
+    with _lock:
+        pool = _async_pools.get(loop)
+        if pool is None:
+            pool = redis.asyncio.BlockingConnectionPool(
+                **_options(redis.asyncio))
+            _async_pools[loop] = pool
+    return redis.asyncio.Redis(connection_pool=pool)
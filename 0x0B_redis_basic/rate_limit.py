@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+    Sliding-window rate limiting on Redis sorted sets
+"""
+from functools import wraps
+from typing import Callable, Optional, Tuple
+from uuid import uuid4
+
+from pool import get_redis
+
+# KEYS[1]: window of one caller, ARGV: limit, period in ms, unique member.
+# Calls of the last period are members scored by their time in ms; the
+# call is counted only when it is allowed. Returns {allowed, remaining,
+# ms until the oldest call leaves the window}.
+SLIDING_WINDOW = """
+local time = redis.call('TIME')
+local now = time[1] * 1000 + math.floor(time[2] / 1000)
+local limit = tonumber(ARGV[1])
+local period = tonumber(ARGV[2])
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now - period)
+local count = redis.call('ZCARD', KEYS[1])
+if count < limit then
+    redis.call('ZADD', KEYS[1], now, ARGV[3])
+    redis.call('PEXPIRE', KEYS[1], period)
+    return {1, limit - count - 1, 0}
+end
+local oldest = redis.call('ZRANGE', KEYS[1], 0, 0, 'WITHSCORES')
+return {0, 0, tonumber(oldest[2]) + period - now}
+"""
+
+
+class RateLimited(Exception):
+    """ Raised when a call goes over its rate limit """
+
+    def __init__(self, key: str, retry_after: float) -> None:
+        """
+            Constructor
+
+            Args:
+                key: window the call was counted in
+                retry_after: seconds until a call is allowed again
+        """
+        super().__init__("rate limit of {} exceeded, retry in {:.3f}s"
+                         .format(key, retry_after))
+        self.key = key
+        self.retry_after = retry_after
+
+
+class RateLimiter:
+    """ At most limit calls per caller in any period seconds """
+
+    def __init__(self, limit: int, period: float,
+                 prefix: str = "rate") -> None:
+        """
+            Constructor
+
+            Args:
+                limit: calls allowed in one window
+                period: length of the sliding window, in seconds
+                prefix: start of the Redis keys of the windows
+        """
+        if limit <= 0 or period <= 0:
+            raise ValueError("limit and period must be positive, got {} "
+                             "and {}".format(limit, period))
+        self.limit = limit
+        self.period = period
+        self.prefix = prefix
+        self._script = None
+        self._client = None
+
+    def hit(self, identity: str) -> Tuple[bool, int, float]:
+        """
+            Count a call of identity, in one round trip (EVALSHA)
+
+            Args:
+                identity: caller to limit, e.g. an IP or an email
+
+            Return:
+                Whether the call is allowed, the calls left in the
+                window and the seconds to wait when it is not allowed
+        """
+        client = get_redis()
+        if self._client is not client:
+            self._script = client.register_script(SLIDING_WINDOW)
+            self._client = client
+        allowed, remaining, wait = self._script(
+            keys=["{}:{}".format(self.prefix, identity)],
+            args=[self.limit, int(self.period * 1000), uuid4().hex])
+        return bool(allowed), remaining, wait / 1000
+
+    def reset(self, identity: str) -> None:
+        """ Forget the calls of identity """
+        get_redis().delete("{}:{}".format(self.prefix, identity))
+
+
+def rate_limit(limit: int, period: float,
+               key: Optional[Callable[..., str]] = None,
+               on_limit: Optional[Callable[[RateLimited], object]] = None)\
+        -> Callable:
+    """
+        Decorator limiting a function to limit calls per period seconds
+
+        Args:
+            limit: calls allowed in one window
+            period: length of the sliding window, in seconds
+            key: called with the arguments of the function, returns the
+                caller to limit (an IP, an email...); one shared window
+                when None
+            on_limit: called with the RateLimited error of a refused
+                call, its result is returned instead; the error is
+                raised when None
+
+        For a Flask view, limiting per email then per IP:
+
+            @rate_limit(5, 60, key=lambda: request.form.get('email'),
+                        on_limit=lambda error: abort(429))
+            @rate_limit(20, 60, key=lambda: request.remote_addr,
+                        on_limit=lambda error: abort(429))
+            def login(): ...
+    """
+    def decorator(method: Callable) -> Callable:
+        """ Wrap method with its own limiter """
+        limiter = RateLimiter(limit, period,
+                              prefix="rate:" + method.__qualname__)
+
+        @wraps(method)
+        def wrapper(*args, **kwargs):
+            """ Wrapper method """
+            identity = key(*args, **kwargs) if key else "*"
+            allowed, _, wait = limiter.hit(identity)
+            if not allowed:
+                error = RateLimited(
+                    "{}:{}".format(limiter.prefix, identity), wait)
+                if on_limit is None:
+                    raise error
+                return on_limit(error)
+            return method(*args, **kwargs)
+
+        wrapper.limiter = limiter
+        return wrapper
+
+    return decorator
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+    Type-preserving serializers for the values of the Redis Cache
+"""
+import struct
+import zlib
+from typing import Any
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import lz4.frame
+except ImportError:
+    lz4 = None
+
+_INT = struct.Struct(">q")
+_FLOAT = struct.Struct(">d")
+
+_CODECS = {
+    "zlib": b"z",
+    "lz4": b"4",
+}
+
+
+class TypedSerializer:
+    """
+        Encode values with a one-byte type tag so they decode to the
+        same type: str, bytes, bool, None, int and float (packed with
+        struct) and, when msgpack is installed, lists and dicts of
+        those. Payloads larger than compress_over bytes are compressed
+        when that makes them smaller.
+    """
+
+    def __init__(self, compress_over: int = 1024,
+                 compression: str = "zlib", level: int = 6) -> None:
+        """
+            Constructor
+
+            Args:
+                compress_over: smallest payload worth compressing, in
+                    bytes (None never compresses)
+                compression: "zlib", or "lz4" when lz4 is installed
+                level: compression level given to the codec
+        """
+        if compression not in _CODECS:
+            raise ValueError("unknown compression {!r}".format(compression))
+        if compression == "lz4" and lz4 is None:
+            raise ValueError("lz4 compression needs the lz4 package")
+        self.compress_over = compress_over
+        self.compression = compression
+        self.level = level
+
+    def dumps(self, value: Any) -> bytes:
+        """
+            Encode a value
+
+            Args:
+                value: value to encode
+
+            Return:
+                Tagged bytes, compressed if large enough to gain from it
+        """
+        data = self._pack(value)
+        if self.compress_over is None or len(data) <= self.compress_over:
+            return data
+        if self.compression == "lz4":
+            packed = lz4.frame.compress(data, compression_level=self.level)
+        else:
+            packed = zlib.compress(data, self.level)
+        if len(packed) + 1 >= len(data):
+            return data
+        return _CODECS[self.compression] + packed
+
+    def loads(self, data: bytes) -> Any:
+        """
+            Decode bytes made by dumps
+
+            Args:
+                data: bytes read back from Redis
+
+            Return:
+                The value given to dumps, with its type
+        """
+        codec = data[:1]
+        if codec == b"z":
+            data = zlib.decompress(data[1:])
+        elif codec == b"4":
+            if lz4 is None:
+                raise ValueError("lz4 compressed value, lz4 not installed")
+            data = lz4.frame.decompress(data[1:])
+        return self._unpack(data)
+
+    @staticmethod
+    def _pack(value: Any) -> bytes:
+        """ Tag and encode a value, uncompressed """
+        if isinstance(value, str):
+            return b"s" + value.encode("utf-8")
+        if isinstance(value, (bytes, bytearray, memoryview)):
+            return b"b" + bytes(value)
+        if value is None:
+            return b"n"
+        if isinstance(value, bool):
+            return b"T" if value else b"F"
+        if isinstance(value, int):
+            try:
+                return b"i" + _INT.pack(value)
+            except struct.error:
+                return b"I" + str(value).encode("ascii")
+        if isinstance(value, float):
+            return b"f" + _FLOAT.pack(value)
+        if msgpack is not None:
+            return b"m" + msgpack.packb(value, use_bin_type=True)
+        raise TypeError("cannot serialize {} without msgpack".format(
+            type(value).__name__))
+
+    @staticmethod
+    def _unpack(data: bytes) -> Any:
+        """ Decode the output of _pack """
+        tag, body = data[:1], data[1:]
+        if tag == b"s":
+            return body.decode("utf-8")
+        if tag == b"b":
+            return body
+        if tag == b"i":
+            return _INT.unpack(body)[0]
+        if tag == b"f":
+            return _FLOAT.unpack(body)[0]
+        if tag == b"n":
+            return None
+        if tag in (b"T", b"F"):
+            return tag == b"T"
+        if tag == b"I":
+            return int(body)
+        if tag == b"m":
+            if msgpack is None:
+                raise ValueError("msgpack encoded value, msgpack not "
+                                 "installed")
+            return msgpack.unpackb(body, raw=False)
+        raise ValueError("unknown type tag {!r}".format(tag))
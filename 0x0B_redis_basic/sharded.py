@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+    Cache spread over several Redis servers by consistent hashing
+"""
+from bisect import bisect, insort
+from hashlib import blake2b
+from typing import Dict, Iterable, List, Optional, Union
+
+import redis
+
+from pool import get_redis
+
+exercise = __import__('exercise')
+Cache = exercise.Cache
+Serializer = exercise.Serializer
+
+# glob matching the uuid4 keys of store / store_many
+STORE_KEYS = "????????-????-????-????-????????????"
+
+
+class HashRing:
+    """
+        Consistent hash ring: every node owns vnodes points of a 64-bit
+        circle and a key belongs to the node of the first point after
+        its hash. Adding or removing one node of n only moves about 1/n
+        of the keys.
+    """
+
+    def __init__(self, nodes: Iterable[str] = (), vnodes: int = 160)\
+            -> None:
+        """
+            Constructor
+
+            Args:
+                nodes: names of the nodes, e.g. "localhost:6380"
+                vnodes: points per node, more spread the keys more evenly
+        """
+        self.vnodes = vnodes
+        self.nodes: List[str] = []
+        self._points: List[tuple] = []
+        self._hashes: List[int] = []
+        for node in nodes:
+            self.add_node(node)
+
+    @staticmethod
+    def _hash(value: str) -> int:
+        """ Position of value on the circle """
+        return int.from_bytes(
+            blake2b(value.encode("utf-8"), digest_size=8).digest(), "big")
+
+    def add_node(self, node: str) -> None:
+        """ Give node its points on the circle """
+        if node in self.nodes:
+            return
+        self.nodes.append(node)
+        for replica in range(self.vnodes):
+            insort(self._points, (self._hash(f"{node}#{replica}"), node))
+        self._hashes = [point for point, _ in self._points]
+
+    def remove_node(self, node: str) -> None:
+        """ Take the points of node off the circle """
+        self.nodes.remove(node)
+        self._points = [point for point in self._points if point[1] != node]
+        self._hashes = [point for point, _ in self._points]
+
+    def node_for(self, key: str) -> str:
+        """
+            Node owning a key
+
+            Args:
+                key: key to place
+
+            Return:
+                Name of its node
+        """
+        if not self._points:
+            raise LookupError("the ring has no nodes")
+        index = bisect(self._hashes, self._hash(key))
+        return self._points[index % len(self._points)][1]
+
+
+class ShardedCache(Cache):
+    """
+        Cache storing each value on the node the ring gives its key.
+        Call counters and history stay on the first node, the home
+        node. The servers are never flushed.
+    """
+
+    def __init__(self, nodes: List[str], vnodes: int = 160,
+                 buffer_counters: bool = False, flush_interval: float = 1.0,
+                 serializer: Optional[Serializer] = None,
+                 scripted: bool = False, metrics: bool = False) -> None:
+        """
+            Constructor
+
+            Args:
+                nodes: servers as "host:port[/db]" or unix socket paths,
+                    the first one being the home node
+                vnodes: points of each node on the hash ring
+                others: as for Cache
+        """
+        self._ring = HashRing(nodes, vnodes)
+        self._home = nodes[0]
+        self._clients: Dict[str, redis.Redis] = {
+            node: get_redis(node) for node in nodes}
+        super().__init__(buffer_counters, flush_interval, serializer,
+                         scripted, flush=False,
+                         client=self._clients[self._home], metrics=metrics)
+
+    @property
+    def nodes(self) -> List[str]:
+        """ Names of the nodes, home node first """
+        return list(self._ring.nodes)
+
+    def _writer(self, key: Optional[str] = None)\
+            -> Union[redis.Redis, redis.client.Pipeline]:
+        """ Client of the node of key, or the home pipeline of the call """
+        if key is None or self._ring.node_for(key) == self._home:
+            return super()._writer()
+        return self._clients[self._ring.node_for(key)]
+
+    def _reader(self, key: str) -> redis.Redis:
+        """ Client of the node of key """
+        return self._clients[self._ring.node_for(key)]
+
+    def _group(self, keys: Iterable[str]) -> Dict[str, List[str]]:
+        """ Keys by node """
+        groups: Dict[str, List[str]] = {}
+        for key in keys:
+            groups.setdefault(self._ring.node_for(key), []).append(key)
+        return groups
+
+    def _mset(self, mapping: dict) -> None:
+        """ One MSET per node, the home one on the call's pipeline """
+        for node, keys in self._group(mapping).items():
+            part = {key: mapping[key] for key in keys}
+            if node == self._home:
+                super()._mset(part)
+            else:
+                self._clients[node].mset(part)
+
+    def _mget(self, keys: List[str]) -> List[Optional[bytes]]:
+        """ One MGET per node, values back in the order of keys """
+        found = {}
+        for node, part in self._group(keys).items():
+            found.update(zip(part, self._clients[node].mget(part)))
+        return [found[key] for key in keys]
+
+    def _migrate(self, source: str, batch: int = 500) -> int:
+        """ Move the stored values of source the ring now puts elsewhere """
+        moved = 0
+        keys: List[bytes] = []
+        for key in self._clients[source].scan_iter(match=STORE_KEYS,
+                                                   count=batch):
+            keys.append(key)
+            if len(keys) == batch:
+                moved += self._move(source, keys)
+                keys = []
+        return moved + (self._move(source, keys) if keys else 0)
+
+    def _move(self, source: str, keys: List[bytes]) -> int:
+        """ DUMP / RESTORE the keys of source that belong to another node """
+        away = [key for key in keys
+                if self._ring.node_for(key.decode()) != source]
+        if not away:
+            return 0
+        client = self._clients[source]
+        pipe = client.pipeline(transaction=False)
+        for key in away:
+            pipe.dump(key)
+            pipe.pttl(key)
+        replies = pipe.execute()
+
+        restore = {}
+        for key, dump, ttl in zip(away, replies[::2], replies[1::2]):
+            if dump is not None:
+                target = self._ring.node_for(key.decode())
+                restore.setdefault(target, []).append(
+                    (key, max(ttl, 0), dump))
+        for target, entries in restore.items():
+            pipe = self._clients[target].pipeline(transaction=False)
+            for key, ttl, dump in entries:
+                pipe.restore(key, ttl, dump, replace=True)
+            pipe.execute()
+        client.delete(*away)
+        return len(away)
+
+    def add_node(self, node: str) -> int:
+        """
+            Add a server, moving to it the values it now owns
+
+            Args:
+                node: server as "host:port[/db]" or a unix socket path
+
+            Return:
+                Number of values moved
+        """
+        if node in self._clients:
+            return 0
+        self._clients[node] = get_redis(node)
+        self._ring.add_node(node)
+        return sum(self._migrate(other) for other in self._ring.nodes
+                   if other != node)
+
+    def remove_node(self, node: str) -> int:
+        """
+            Remove a server, moving its values to the others
+
+            Args:
+                node: server to remove, any but the home node
+
+            Return:
+                Number of values moved
+        """
+        if node == self._home:
+            raise ValueError("cannot remove the home node " + node)
+        self._ring.remove_node(node)
+        moved = self._migrate(node)
+        del self._clients[node]
+        return moved
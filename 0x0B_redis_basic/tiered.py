@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+"""
+    Two-tier cache: in-process LRU in front of Redis
+"""
+import os
+import sys
+import threading
+from collections import Counter
+from typing import Union, Callable, Iterable, List, Optional
+
+import redis
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                '..', 'caching'))
+ConcurrentCache = __import__('concurrent_caching').ConcurrentCache
+LRUCache = __import__('3-lru_cache').LRUCache
+
+exercise = __import__('exercise')
+Cache = exercise.Cache
+Serializer = exercise.Serializer
+
+INVALIDATION_CHANNEL = "cache:invalidate"
+# keyspace notifications needed: string writes, generic commands (DEL,
+# EXPIRE, RENAME...), expirations and evictions
+KEYSPACE_EVENTS = "K$gxe"
+# event classes covered by the alias A of notify-keyspace-events
+ALL_EVENTS = "$glshzxetd"
+
+
+class TieredCache(Cache):
+    """ Cache reading from a local LRU before going to Redis """
+
+    def __init__(self, max_items: int = 10000, keyspace: bool = False,
+                 channel: str = INVALIDATION_CHANNEL,
+                 serializer: Optional[Serializer] = None,
+                 client: Optional[redis.Redis] = None) -> None:
+        """
+            Constructor
+
+            Args:
+                max_items: capacity of the in-process tier
+                keyspace: listen to Redis keyspace notifications instead
+                    of the invalidation channel, so writes made by any
+                    client (not only TieredCache) evict local copies
+                channel: pub/sub channel used to broadcast invalidations
+                serializer: encoding of the values, as for Cache
+                client: server of the cache, the shared pool when None
+
+            The server is shared by every process running a TieredCache,
+            so it is never flushed.
+        """
+        super().__init__(serializer=serializer, flush=False, client=client)
+        self._local = ConcurrentCache(LRUCache, max_items=max_items,
+                                      on_evict=None)
+        self._encoder = self._redis.connection_pool.get_encoder()
+        self._channel = channel
+        self._keyspace = keyspace
+        # guards the bookkeeping below against the listener thread
+        self._lock = threading.Lock()
+        # reads from Redis in flight per key, and the keys invalidated
+        # meanwhile, whose value read may be stale
+        self._fills: Counter = Counter()
+        self._dirty = set()
+        # SET notifications of our own writes still to come, per key
+        self._own: Counter = Counter()
+
+        self._pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+        if keyspace:
+            self._enable_keyspace_events()
+            db = self._redis.connection_pool.connection_kwargs.get("db", 0)
+            self._pubsub.psubscribe(**{
+                "__keyspace@{}__:*".format(db): self._on_keyspace})
+        else:
+            self._pubsub.subscribe(**{channel: self._on_invalidate})
+        self._listener = self._pubsub.run_in_thread(sleep_time=0.1,
+                                                    daemon=True)
+
+    def _enable_keyspace_events(self) -> None:
+        """
+            Add the event classes TieredCache needs to the server-wide
+            notify-keyspace-events, keeping the ones already enabled
+        """
+        try:
+            current = self._redis.config_get("notify-keyspace-events")\
+                .get("notify-keyspace-events", "")
+            covered = current + (ALL_EVENTS if "A" in current else "")
+            missing = "".join(flag for flag in KEYSPACE_EVENTS
+                              if flag not in covered)
+            if missing:
+                self._redis.config_set("notify-keyspace-events",
+                                       current + missing)
+        except redis.ResponseError:
+            # CONFIG may be disabled: the server must then be
+            # configured by hand
+            pass
+
+    def _drop(self, key: str) -> None:
+        """ Drop the local copy of key, and any value being read for it """
+        with self._lock:
+            if key in self._fills:
+                self._dirty.add(key)
+            self._local.delete(key)
+
+    def _on_invalidate(self, message: dict) -> None:
+        """ Drop the local copy of a key invalidated by any process """
+        self._drop(message["data"].decode("utf-8"))
+
+    def _on_keyspace(self, message: dict) -> None:
+        """
+            Drop the local copy of a key touched on the server, except
+            on the notification of a write of this cache
+        """
+        key = message["channel"].decode("utf-8").split(":", 1)[1]
+        # Redis reports MSET as one set event per key, some servers
+        # that speak its protocol as mset
+        if message["data"] in (b"set", b"mset"):
+            with self._lock:
+                if self._own[key]:
+                    self._own[key] -= 1
+                    if not self._own[key]:
+                        del self._own[key]
+                    return
+        self._drop(key)
+
+    def _expect_writes(self, keys: Iterable[str]) -> None:
+        """ Ignore the coming SET notifications of keys we write """
+        if self._keyspace:
+            with self._lock:
+                for key in keys:
+                    self._own[key] += 1
+
+    def _writer(self, key: Optional[str] = None)\
+            -> Union[redis.Redis, redis.client.Pipeline]:
+        """ Writer of Cache, expecting the notification of the write """
+        if key is not None:
+            self._expect_writes((key,))
+        return super()._writer(key)
+
+    def _mset(self, mapping: dict) -> None:
+        """ MSET of Cache, expecting the notifications of the writes """
+        self._expect_writes(mapping)
+        super()._mset(mapping)
+
+    def _begin_fill(self, keys: Iterable[str]) -> None:
+        """ Mark keys as being read from Redis for the local tier """
+        with self._lock:
+            for key in keys:
+                self._fills[key] += 1
+
+    def _end_fill(self, keys: Iterable[str], values: dict) -> None:
+        """
+            Put the values read for keys in the local tier, except those
+            of keys invalidated since _begin_fill
+        """
+        with self._lock:
+            fresh = {}
+            for key in keys:
+                value = values.get(key)
+                if value is not None and key not in self._dirty:
+                    fresh[key] = value
+                self._fills[key] -= 1
+                if not self._fills[key]:
+                    del self._fills[key]
+                    self._dirty.discard(key)
+            self._local.put_many(fresh)
+
+    def store(self, data: Union[str, bytes, int, float]) -> str:
+        """
+            Write-through store: Redis first, then the local tier
+
+            Args:
+                data: bring the information to store
+
+            Return:
+                Key or number uuid
+        """
+        key = super().store(data)
+        self._local.put(key, self._encoder.encode(self._dumps(data)))
+        return key
+
+    def store_many(self, values: List[Union[str, bytes, int, float]])\
+            -> List[str]:
+        """
+            Write-through store of several values
+
+            Args:
+                values: bring the information to store
+
+            Return:
+                Keys of the values, in the same order
+        """
+        keys = super().store_many(values)
+        self._local.put_many({key: self._encoder.encode(self._dumps(value))
+                              for key, value in zip(keys, values)})
+        return keys
+
+    def get(self, key: str, fn: Optional[Callable] = None)\
+            -> Union[str, bytes, int, float]:
+        """
+            Read-through get: local tier first, Redis on a miss
+
+            Args:
+                key: key returned by store
+                fn: optional conversion applied to the value
+
+            Return:
+                The stored value, converted by fn if given
+        """
+        value = self._local.get(key)
+        if value is None:
+            self._begin_fill((key,))
+            try:
+                value = self._reader(key).get(key)
+            finally:
+                self._end_fill((key,), {key: value})
+        value = self._loads(value)
+
+        if fn:
+            return fn(value)
+
+        return value
+
+    def get_many(self, keys: List[str], fn: Optional[Callable] = None)\
+            -> List[Union[str, bytes, int, float]]:
+        """
+            Read-through get of several keys, one MGET for the misses
+
+            Args:
+                keys: keys returned by store or store_many
+                fn: optional conversion applied to each value
+
+            Return:
+                The values in the order of keys, None for missing ones
+        """
+        found = self._local.get_many(keys)
+        missing = list(dict.fromkeys(key for key in keys if key not in found))
+        if missing:
+            fetched = {}
+            self._begin_fill(missing)
+            try:
+                fetched = {key: value for key, value
+                           in zip(missing, self._mget(missing))
+                           if value is not None}
+            finally:
+                self._end_fill(missing, fetched)
+            found.update(fetched)
+        values = [self._loads(found.get(key)) for key in keys]
+
+        if fn:
+            return [fn(value) for value in values]
+
+        return values
+
+    def invalidate(self, key: str) -> None:
+        """
+            Delete a key everywhere and tell the other processes
+
+            Args:
+                key: key to drop from Redis and every local tier
+        """
+        self._drop(key)
+        pipe = self._redis.pipeline()
+        pipe.delete(key)
+        pipe.publish(self._channel, key)
+        pipe.execute()
+
+    def close(self) -> None:
+        """ Stop listening for invalidations """
+        self._listener.stop()
+        self._pubsub.close()
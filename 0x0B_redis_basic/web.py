@@ -1,28 +1,109 @@
 #!/usr/bin/env python3
 """ Tracker callls """
 
-import redis
+import re
+import time
 import requests
-from typing import Callable
+from typing import Callable, List, Pattern, Tuple
 from functools import wraps
+from uuid import uuid4
+
+import redis
+
+from pool import get_redis
+
+DEFAULT_TTL: int = 10
+STALE_TTL: int = 60
+LOCK_TIMEOUT: float = 10.0
+POLL_INTERVAL: float = 0.05
+
+TTL_RULES: List[Tuple[Pattern, int]] = []
+
+
+def set_ttl(pattern: str, ttl: int) -> None:
+    """
+        Cache the pages whose url matches pattern for ttl seconds
+
+        Args:
+            pattern: regex searched in the url; rules set last win
+            ttl: seconds a page stays fresh
+    """
+    TTL_RULES.insert(0, (re.compile(pattern), ttl))
+
+
+def ttl_for(url: str) -> int:
+    """ Seconds a page of url stays fresh """
+    for pattern, ttl in TTL_RULES:
+        if pattern.search(url):
+            return ttl
+    return DEFAULT_TTL
 
-r = redis.Redis()
+
+def _release(r: redis.Redis, lock: str, token: str) -> None:
+    """ Delete the lock only while it is still the one we took """
+    with r.pipeline() as pipe:
+        try:
+            pipe.watch(lock)
+            if pipe.get(lock) == token.encode():
+                pipe.multi()
+                pipe.delete(lock)
+                pipe.execute()
+        except redis.WatchError:
+            pass
 
 
 def count_calls(method: Callable) -> Callable:
-    """ Decorator to know the number of calls """
+    """
+        Decorator to know the number of calls, caching the pages
+
+        A page is fresh in cached:{url} for ttl_for(url) seconds and a
+        copy stays in stale:{url} STALE_TTL seconds longer. On a miss a
+        single caller, holding the SET NX lock:{url}, fetches the page
+        while the others serve the stale copy, or wait for the fresh
+        one when there is none.
+    """
 
     @wraps(method)
     def wrapper(url):
         """ Wrapper decorator """
-        r.incr(f"count:{url}")
-        cached_html = r.get(f"cached:{url}")
+        r = get_redis()
+        pipe = r.pipeline(transaction=False)
+        pipe.incr(f"count:{url}")
+        pipe.get(f"cached:{url}")
+        _, cached_html = pipe.execute()
         if cached_html:
             return cached_html.decode('utf-8')
 
-        html = method(url)
-        r.setex(f"cached:{url}", 10, html)
-        return html
+        lock, token = f"lock:{url}", uuid4().hex
+        if r.set(lock, token, nx=True, px=int(LOCK_TIMEOUT * 1000)):
+            try:
+                html = method(url)
+                ttl = ttl_for(url)
+                pipe = r.pipeline(transaction=False)
+                pipe.setex(f"cached:{url}", ttl, html)
+                pipe.setex(f"stale:{url}", ttl + STALE_TTL, html)
+                pipe.execute()
+                return html
+            finally:
+                _release(r, lock, token)
+
+        stale_html = r.get(f"stale:{url}")
+        if stale_html:
+            return stale_html.decode('utf-8')
+
+        deadline = time.monotonic() + LOCK_TIMEOUT
+        while time.monotonic() < deadline:
+            time.sleep(POLL_INTERVAL)
+            pipe = r.pipeline(transaction=False)
+            pipe.get(f"cached:{url}")
+            pipe.exists(lock)
+            cached_html, locked = pipe.execute()
+            if cached_html:
+                return cached_html.decode('utf-8')
+            if not locked:
+                break
+
+        return method(url)
 
     return wrapper
 
@@ -10,10 +10,41 @@ class BasicCache(BaseCaching):
     def put(self, key, item):
         ''' self descriptive '''
         if key and item:
+            if key not in self.cache_data:
+                self.inserts += 1
             self.cache_data[key] = item
 
     def get(self, key):
         ''' self descriptive '''
         if key in self.cache_data:
+            self.hits += 1
             return self.cache_data[key]
+        self.misses += 1
         return None
+
+    def get_many(self, keys):
+        ''' self descriptive '''
+        data = self.cache_data
+        found = {}
+        lookups = hits = 0
+        for key in keys:
+            lookups += 1
+            if key in data:
+                found[key] = data[key]
+                hits += 1
+        self.hits += hits
+        self.misses += lookups - hits
+        return found
+
+    def put_many(self, mapping):
+        ''' self descriptive '''
+        data = self.cache_data
+        for key, item in mapping.items():
+            if key and item:
+                if key not in data:
+                    self.inserts += 1
+                data[key] = item
+
+    def delete(self, key):
+        ''' self descriptive '''
+        self.cache_data.pop(key, None)
@@ -1,33 +1,33 @@
 #!/usr/bin/python3
 ''' self descriptive code '''
 
-BaseCaching = __import__('base_caching').BaseCaching
+LinkedCaching = __import__('linked_caching').LinkedCaching
 
 
-class FIFOCache(BaseCaching):
+class FIFOCache(LinkedCaching):
     ''' self descriptive '''
 
-    def __init__(self):
-        super().__init__()
-        self.key_indexes = []
+    def _victim(self, keep=None):
+        ''' first inserted entry sits at the front of the ring '''
+        node = self._root.next
+        return node.next if node is keep else node
+
+    def _touch_many(self, nodes):
+        ''' reads and updates never reorder the queue '''
 
     def put(self, key, item):
         ''' self descriptive '''
-        if key and item:
-            if key in self.cache_data:
-                self.cache_data[key] = item
-                return
-
-            if len(self.cache_data) >= BaseCaching.MAX_ITEMS:
-                item_discarded = self.key_indexes.pop(0)
-                del self.cache_data[item_discarded]
-                print("DISCARD:", item_discarded)
-
-            self.cache_data[key] = item
-            self.key_indexes.append(key)
+        if key and item and key in self._nodes:
+            # an update keeps the original place in the queue
+            self._update(self._nodes[key], item, self.item_size(item))
+            return
+        super().put(key, item)
 
     def get(self, key):
         ''' self descriptive '''
-        if key in self.cache_data:
-            return self.cache_data[key]
-        return None
+        node = self._nodes.get(key)
+        if node is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return node.item
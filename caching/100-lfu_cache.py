@@ -0,0 +1,174 @@
+#!/usr/bin/python3
+''' self descriptive code '''
+
+linked_caching = __import__('linked_caching')
+LinkedCaching = linked_caching.LinkedCaching
+_Node = linked_caching._Node
+_SizedNode = linked_caching._SizedNode
+_link_back = linked_caching._link_back
+_unlink = linked_caching._unlink
+
+
+class _FreqNode(_SizedNode):
+    ''' cache entry that knows its frequency bucket '''
+    __slots__ = ('bucket',)
+
+
+class _Bucket():
+    ''' entries sharing one use count, least recently used first '''
+    __slots__ = ('prev', 'next', 'freq', 'root')
+
+    def __init__(self, freq=0):
+        self.prev = self.next = self
+        self.freq = freq
+        self.root = _Node()
+
+
+class LFUCache(LinkedCaching):
+    ''' Least frequently used cache, ties broken by least recently used
+
+    Buckets are kept in a list sorted by frequency, so finding the victim
+    and counting a use are both O(1). With decay_every set, every use
+    count is halved after that many operations so formerly hot keys age
+    out; the O(n) rebuild is amortized when decay_every >= max_items.
+    '''
+
+    def __init__(self, *args, decay_every=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._head = _Bucket()
+        self.decay_every = decay_every
+        self._ops = 0
+
+    def _bucket_after(self, bucket, freq):
+        ''' bucket for freq right after bucket, created if missing '''
+        following = bucket.next
+        if following is self._head or following.freq != freq:
+            following = _Bucket(freq)
+            _link_back(bucket.next, following)
+        return following
+
+    def _place(self, node, bucket):
+        ''' make node the most recent entry of bucket '''
+        _link_back(bucket.root, node)
+        node.bucket = bucket
+
+    def _bump(self, node):
+        ''' count one more use of node '''
+        old = node.bucket
+        new = self._bucket_after(old, old.freq + 1)
+        _unlink(node)
+        self._place(node, new)
+        if old.root.next is old.root:
+            _unlink(old)
+
+    def _touch_many(self, nodes):
+        ''' count one more use of every node '''
+        for node in nodes:
+            self._bump(node)
+            self._tick()
+
+    def _tick(self):
+        ''' age the use counts every decay_every operations '''
+        if self.decay_every is None:
+            return
+        self._ops += 1
+        if self._ops >= self.decay_every:
+            self._ops = 0
+            self._decay()
+
+    def _decay(self):
+        ''' halve every use count, merging buckets that collide '''
+        bucket = self._head.next
+        self._head.prev = self._head.next = self._head
+        target = self._head
+        while bucket is not self._head:
+            following = bucket.next
+            freq = max(1, bucket.freq // 2)
+            if target.freq != freq:
+                target = self._bucket_after(target, freq)
+            root = bucket.root
+            node = root.next
+            while node is not root:
+                after = node.next
+                self._place(node, target)
+                node = after
+            bucket = following
+
+    def _victim(self, keep=None):
+        ''' least recently used entry of the lowest frequency bucket '''
+        bucket = self._head.next
+        node = bucket.root.next
+        if node is keep:
+            node = node.next
+            if node is bucket.root:
+                node = bucket.next.root.next
+        return node
+
+    def _remove(self, node):
+        ''' drop node and its bucket when it becomes empty '''
+        super()._remove(node)
+        bucket = node.bucket
+        if bucket.root.next is bucket.root:
+            _unlink(bucket)
+
+    def put(self, key, item):
+        ''' self descriptive '''
+        if not key or not item:
+            return
+
+        size = self.item_size(item)
+        node = self._nodes.get(key)
+        if node is not None:
+            if self._update(node, item, size):
+                self._bump(node)
+                self._tick()
+            return
+
+        if not self.fits(size):
+            return
+        while self.is_full(size):
+            self._discard(self._victim())
+
+        node = _FreqNode(key, item, size)
+        self.inserts += 1
+        self._nodes[key] = node
+        self.used_bytes += size
+        self._place(node, self._bucket_after(self._head, 1))
+        self._tick()
+
+    def get(self, key):
+        ''' self descriptive '''
+        node = self._nodes.get(key)
+        if node is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._bump(node)
+        self._tick()
+        return node.item
+
+    def _export(self):
+        ''' entries with their use count, lowest bucket first '''
+        state = []
+        bucket = self._head.next
+        while bucket is not self._head:
+            root = bucket.root
+            node = root.next
+            while node is not root:
+                state.append((node.key, node.item, bucket.freq))
+                node = node.next
+            bucket = bucket.next
+        return state
+
+    def _import(self, state):
+        ''' rebuild the buckets, keeping the entries evicted last '''
+        bucket = self._head
+        for key, item, freq in state:
+            if bucket.freq != freq:
+                bucket = self._bucket_after(bucket, freq)
+            node = _FreqNode(key, item, self.item_size(item))
+            self._nodes[key] = node
+            self.used_bytes += node.size
+            self._place(node, bucket)
+        while self.over_limits():
+            self._remove(self._victim())
@@ -0,0 +1,211 @@
+#!/usr/bin/python3
+''' self descriptive code '''
+
+linked_caching = __import__('linked_caching')
+LinkedCaching = linked_caching.LinkedCaching
+_Node = linked_caching._Node
+_SizedNode = linked_caching._SizedNode
+_link_back = linked_caching._link_back
+_unlink = linked_caching._unlink
+
+
+class _Ring(_Node):
+    ''' sentinel of one ARC list, least recently used first '''
+    __slots__ = ('count',)
+
+    def __init__(self):
+        super().__init__()
+        self.count = 0
+
+
+class _ArcNode(_SizedNode):
+    ''' cache entry or ghost key that knows the list holding it '''
+    __slots__ = ('ring',)
+
+
+class ARCCache(LinkedCaching):
+    ''' Adaptive Replacement Cache (Megiddo and Modha)
+
+    T1 holds keys seen once recently, T2 keys seen at least twice. B1
+    and B2 remember the keys recently evicted from T1 and T2 without
+    their items, and a hit in one of them shifts the target size p of
+    T1 towards the list that would have kept the key. A one-shot scan
+    only ever fills T1, so it cannot flush the frequently used keys
+    living in T2.
+    '''
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._t1, self._t2 = _Ring(), _Ring()
+        self._b1, self._b2 = _Ring(), _Ring()
+        self._ghosts = {}
+        self.p = 0
+
+    def _push(self, ring, node):
+        ''' make node the most recent entry of ring '''
+        _link_back(ring, node)
+        node.ring = ring
+        ring.count += 1
+
+    def _pop(self, node):
+        ''' take node out of its ring '''
+        _unlink(node)
+        node.ring.count -= 1
+
+    def _touch_many(self, nodes):
+        ''' entries used again move to the most recent end of T2 '''
+        t2 = self._t2
+        for node in nodes:
+            self._pop(node)
+            self._push(t2, node)
+
+    def _forget(self, ring):
+        ''' drop the oldest ghost of ring '''
+        node = ring.next
+        self._pop(node)
+        del self._ghosts[node.key]
+
+    def _remove(self, node):
+        ''' drop a resident node from the cache '''
+        self._pop(node)
+        del self._nodes[node.key]
+        self.used_bytes -= node.size
+
+    def _replace(self, in_b2=False):
+        ''' evict from T1 or T2 according to p, keeping a ghost '''
+        t1, t2 = self._t1, self._t2
+        if t1.count and (t1.count > self.p or
+                         (in_b2 and t1.count == self.p) or not t2.count):
+            node, ghosts = t1.next, self._b1
+        else:
+            node, ghosts = t2.next, self._b2
+        self._discard(node)
+        node.item = None
+        node.size = 0
+        self._push(ghosts, node)
+        self._ghosts[node.key] = node
+
+    def _trim_ghosts(self):
+        ''' keep |T1| + |B1| <= c and the whole directory <= 2c '''
+        c = self.max_items
+        while self._b1.count and self._t1.count + self._b1.count > c:
+            self._forget(self._b1)
+        while self._ghosts and len(self._nodes) + len(self._ghosts) > 2 * c:
+            self._forget(self._b2 if self._b2.count else self._b1)
+
+    def _make_room(self, size, in_b2=False):
+        ''' evict until an item of size bytes fits the byte budget '''
+        while (self.max_bytes is not None and
+               self.used_bytes + size > self.max_bytes):
+            self._replace(in_b2)
+
+    def put(self, key, item):
+        ''' self descriptive '''
+        if not key or not item:
+            return
+
+        size = self.item_size(item)
+        node = self._nodes.get(key)
+        if node is not None:
+            self._remove(node)
+            if not self.fits(size):
+                return
+            self._make_room(size)
+            self._admit(node, item, size, self._t2)
+            return
+        if not self.fits(size):
+            return
+
+        c = self.max_items
+        t1, b1, b2 = self._t1, self._b1, self._b2
+        node = self._ghosts.pop(key, None)
+        if node is not None:
+            in_b2 = node.ring is b2
+            if in_b2:
+                self.p = max(0, self.p - max(1, b1.count // b2.count))
+            else:
+                self.p = min(c, self.p + max(1, b2.count // b1.count))
+            self._pop(node)
+            self.inserts += 1
+            if len(self._nodes) >= c:
+                self._replace(in_b2)
+            self._make_room(size, in_b2)
+            self._admit(node, item, size, self._t2)
+            return
+
+        if t1.count + b1.count >= c:
+            if t1.count < c:
+                self._forget(b1)
+                if len(self._nodes) >= c:
+                    self._replace()
+            else:
+                self._discard(t1.next)
+        elif len(self._nodes) + len(self._ghosts) >= c:
+            if b2.count and len(self._nodes) + len(self._ghosts) >= 2 * c:
+                self._forget(b2)
+            if len(self._nodes) >= c:
+                self._replace()
+        self.inserts += 1
+        self._make_room(size)
+        self._admit(_ArcNode(key), item, size, t1)
+
+    def _admit(self, node, item, size, ring):
+        ''' store item in node as the most recent entry of ring '''
+        node.item = item
+        node.size = size
+        self._nodes[node.key] = node
+        self.used_bytes += size
+        self._push(ring, node)
+        self._trim_ghosts()
+
+    def get(self, key):
+        ''' self descriptive '''
+        node = self._nodes.get(key)
+        if node is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._pop(node)
+        self._push(self._t2, node)
+        return node.item
+
+    def _export(self):
+        ''' p and the four lists, least recently used first '''
+        def keys(ring):
+            node, found = ring.next, []
+            while node is not ring:
+                found.append(node.key)
+                node = node.next
+            return found
+
+        return {
+            'p': self.p,
+            't1': [(key, self._nodes[key].item) for key in keys(self._t1)],
+            't2': [(key, self._nodes[key].item) for key in keys(self._t2)],
+            'b1': keys(self._b1),
+            'b2': keys(self._b2),
+        }
+
+    def _import(self, state):
+        ''' rebuild the four lists, then shrink them to the limits '''
+        self._t1, self._t2 = _Ring(), _Ring()
+        self._b1, self._b2 = _Ring(), _Ring()
+        self._ghosts = {}
+        self.p = min(state['p'], self.max_items)
+        for name in ('b1', 'b2'):
+            ring = getattr(self, '_' + name)
+            for key in state[name]:
+                node = _ArcNode(key)
+                self._push(ring, node)
+                self._ghosts[key] = node
+        for name in ('t1', 't2'):
+            ring = getattr(self, '_' + name)
+            for key, item in state[name]:
+                node = _ArcNode(key, item, self.item_size(item))
+                self._ghosts.pop(key, None)
+                self._nodes[key] = node
+                self.used_bytes += node.size
+                self._push(ring, node)
+        while self.over_limits():
+            self._replace()
+        self._trim_ghosts()
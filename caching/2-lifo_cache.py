@@ -1,33 +1,28 @@
 #!/usr/bin/python3
 ''' self descriptive code '''
 
-BaseCaching = __import__('base_caching').BaseCaching
+LinkedCaching = __import__('linked_caching').LinkedCaching
 
 
-class LIFOCache(BaseCaching):
+class LIFOCache(LinkedCaching):
     ''' self descriptive '''
 
-    def __init__(self):
-        super().__init__()
-        self.key_indexes = []
+    def _victim(self, keep=None):
+        ''' last inserted or updated entry sits at the back of the ring '''
+        return self._root.prev
 
-    def put(self, key, item):
-        ''' self descriptive '''
-        if key and item:
-            if len(self.cache_data) >= self.MAX_ITEMS:
-                if key in self.cache_data:
-                    del self.cache_data[key]
-                    self.key_indexes.remove(key)
-                else:
-                    del self.cache_data[self.key_indexes[self.MAX_ITEMS - 1]]
-                    item_discarded = self.key_indexes.pop(self.MAX_ITEMS - 1)
-                    print("DISCARD:", item_discarded)
+    def _touch_many(self, nodes):
+        ''' reads never reorder the stack '''
 
-            self.cache_data[key] = item
-            self.key_indexes.append(key)
+    def _requeue_many(self, nodes):
+        ''' updated entries become the most recent ones '''
+        LinkedCaching._touch_many(self, nodes)
 
     def get(self, key):
         ''' self descriptive '''
-        if key in self.cache_data:
-            return self.cache_data[key]
-        return None
+        node = self._nodes.get(key)
+        if node is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return node.item
@@ -1,36 +1,12 @@
 #!/usr/bin/python3
 ''' self descriptive code '''
 
-from collections import OrderedDict
+LinkedCaching = __import__('linked_caching').LinkedCaching
 
-BaseCaching = __import__('base_caching').BaseCaching
 
-
-class LRUCache(BaseCaching):
+class LRUCache(LinkedCaching):
     ''' self descriptive '''
 
-    def __init__(self):
-        super().__init__()
-        self.lru_order = OrderedDict()
-
-    def put(self, key, item):
-        ''' self descriptive '''
-        if key and item:
-            self.lru_order[key] = item
-            self.lru_order.move_to_end(key)
-            self.cache_data[key] = item
-
-        if len(self.cache_data) > BaseCaching.MAX_ITEMS:
-            item_discarded = next(iter(self.lru_order))
-            del self.cache_data[item_discarded]
-            print("DISCARD:", item_discarded)
-
-        if len(self.lru_order) > BaseCaching.MAX_ITEMS:
-            self.lru_order.popitem(last=False)
-
-    def get(self, key):
-        ''' self descriptive '''
-        if key in self.cache_data:
-            self.lru_order.move_to_end(key)
-            return self.cache_data[key]
-        return None
+    def _victim(self, keep=None):
+        ''' least recently used entry sits at the front of the ring '''
+        return self._root.next
@@ -1,39 +1,12 @@
 #!/usr/bin/python3
 ''' self descriptive code '''
 
-from collections import OrderedDict
+LinkedCaching = __import__('linked_caching').LinkedCaching
 
-BaseCaching = __import__('base_caching').BaseCaching
 
-
-class MRUCache(BaseCaching):
+class MRUCache(LinkedCaching):
     ''' self descriptive '''
 
-    def __init__(self):
-        super().__init__()
-        self.mru_order = OrderedDict()
-
-    def put(self, key, item):
-        ''' self descriptive '''
-        if not key or not item:
-            return
-
-        self.cache_data[key] = item
-        self.mru_order[key] = item
-
-        if len(self.cache_data) > BaseCaching.MAX_ITEMS:
-            item_discarded = next(iter(self.mru_order))
-            del self.cache_data[item_discarded]
-            print("DISCARD:", item_discarded)
-
-        if len(self.mru_order) > BaseCaching.MAX_ITEMS:
-            self.mru_order.popitem(last=False)
-
-        self.mru_order.move_to_end(key, False)
-
-    def get(self, key):
-        ''' self descriptive '''
-        if key in self.cache_data:
-            self.mru_order.move_to_end(key, False)
-            return self.cache_data[key]
-        return None
+    def _victim(self, keep=None):
+        ''' most recently used entry sits at the back of the ring '''
+        return self._root.prev
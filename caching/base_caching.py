@@ -1,18 +1,168 @@
 #!/usr/bin/python3
 """ BaseCaching module
 """
+import os
+import pickle
+import sys
+import time
+
+SNAPSHOT_MAGIC = b"HBCACHE1"
+
+
+def discard(key, item):
+    """ Default eviction callback: report the discarded key
+    """
+    print("DISCARD:", key)
+
+
+class LatencyHistogram():
+    """ LatencyHistogram counts durations in power-of-two nanosecond
+    buckets, so recording one costs a bit_length and an increment
+    """
+
+    def __init__(self):
+        """ Initiliaze
+        """
+        self.buckets = [0] * 64
+        self.count = 0
+        self.total = 0
+
+    def record(self, ns):
+        """ Count one duration of ns nanoseconds
+        """
+        self.buckets[ns.bit_length()] += 1
+        self.count += 1
+        self.total += ns
+
+    def percentile(self, fraction):
+        """ Upper bound in nanoseconds of the given fraction of durations
+        """
+        rank = fraction * self.count
+        seen = 0
+        for index, count in enumerate(self.buckets):
+            seen += count
+            if count and seen >= rank:
+                return 1 << index
+        return 0
+
+    def snapshot(self):
+        """ Summary of the recorded durations
+        """
+        return {
+            'count': self.count,
+            'mean_ns': self.total // self.count if self.count else 0,
+            'p50_ns': self.percentile(0.5),
+            'p99_ns': self.percentile(0.99),
+            'buckets': {1 << index: count
+                        for index, count in enumerate(self.buckets) if count},
+        }
+
 
 class BaseCaching():
     """ BaseCaching defines:
       - constants of your caching system
       - where your data are stored (in a dictionary)
+      - the item and byte limits of an instance
+      - the counters reported by stats()
     """
     MAX_ITEMS = 4
+    COUNTERS = ('hits', 'misses', 'inserts', 'evictions')
+    TIMED = ('get', 'put', 'delete', 'get_many', 'put_many')
 
-    def __init__(self):
+    def __init__(self, max_items=None, max_bytes=None, sizer=sys.getsizeof,
+                 on_evict=discard, track_latency=False):
         """ Initiliaze
+
+        max_items defaults to MAX_ITEMS, max_bytes to no byte budget.
+        sizer returns the size of an item in bytes, e.g. sys.getsizeof
+        or len for bytes values. on_evict(key, item) is called for every
+        evicted entry (None to stay silent). track_latency times every
+        get, put, delete and batch call into a LatencyHistogram.
         """
         self.cache_data = {}
+        self.max_items = self.MAX_ITEMS if max_items is None else max_items
+        self.max_bytes = max_bytes
+        self.sizer = sizer
+        self.used_bytes = 0
+        self.on_evict = on_evict
+        self.hits = self.misses = self.inserts = self.evictions = 0
+        self.latency = None
+        if track_latency:
+            self.latency = {}
+            for name in self.TIMED:
+                self.latency[name] = LatencyHistogram()
+                setattr(self, name,
+                        self._timed(getattr(self, name), self.latency[name]))
+
+    @staticmethod
+    def _timed(method, histogram):
+        """ Wrap a bound method so each call is recorded in histogram
+        """
+        clock = time.perf_counter_ns
+
+        def timed(*args, **kwargs):
+            """ Call method and record its duration
+            """
+            start = clock()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                histogram.record(clock() - start)
+
+        return timed
+
+    def evicted(self, key, item):
+        """ Count an eviction and notify the on_evict callback
+        """
+        self.evictions += 1
+        if self.on_evict is not None:
+            self.on_evict(key, item)
+
+    def latency_stats(self):
+        """ Snapshot of the latency histograms, None when not tracked
+        """
+        if self.latency is None:
+            return None
+        return {name: histogram.snapshot()
+                for name, histogram in self.latency.items()}
+
+    def stats(self):
+        """ Snapshot of the counters, cheap enough to be scraped often
+        """
+        snapshot = {name: getattr(self, name) for name in self.COUNTERS}
+        snapshot['items'] = len(self.cache_data)
+        snapshot['bytes'] = self.used_bytes
+        snapshot['latency'] = self.latency_stats()
+        return snapshot
+
+    def item_size(self, item):
+        """ Size charged against the byte budget for item
+        """
+        if self.max_bytes is None:
+            return 0
+        return self.sizer(item)
+
+    def fits(self, size):
+        """ Tell whether an item of size bytes can be cached at all
+        """
+        if self.max_items <= 0:
+            return False
+        return self.max_bytes is None or size <= self.max_bytes
+
+    def is_full(self, size=0):
+        """ Tell whether adding an item of size bytes breaks a limit
+        """
+        if len(self.cache_data) >= self.max_items:
+            return True
+        return (self.max_bytes is not None and
+                self.used_bytes + size > self.max_bytes)
+
+    def over_limits(self):
+        """ Tell whether the cache holds more than its limits allow
+        """
+        if len(self.cache_data) > self.max_items:
+            return True
+        return self.max_bytes is not None and self.used_bytes > self.max_bytes
 
     def print_cache(self):
         """ Print the cache
@@ -30,3 +180,71 @@ class BaseCaching():
         """ Get an item by key
         """
         raise NotImplementedError("get must be implemented in your cache class")
+
+    def delete(self, key):
+        """ Remove an item by key, if present
+        """
+        raise NotImplementedError(
+            "delete must be implemented in your cache class")
+
+    def get_many(self, keys):
+        """ Get the items of several keys, as a dict of the keys found
+        """
+        found = {}
+        for key in keys:
+            item = self.get(key)
+            if item is not None:
+                found[key] = item
+        return found
+
+    def put_many(self, mapping):
+        """ Add every item of mapping in the cache
+        """
+        for key, item in mapping.items():
+            self.put(key, item)
+
+    def _export(self):
+        """ Picklable state of the entries, in eviction order
+        """
+        return list(self.cache_data.items())
+
+    def _import(self, state):
+        """ Fill the empty cache from the result of _export
+        """
+        for key, item in state:
+            self.put(key, item)
+
+    def snapshot(self, path):
+        """ Save the entries and their eviction order to path
+
+        The file is written next to path then renamed over it, so a
+        crash never leaves a truncated snapshot behind.
+        """
+        tmp = "{}.tmp".format(path)
+        with open(tmp, "wb") as f:
+            f.write(SNAPSHOT_MAGIC)
+            pickle.dump((type(self).__name__, self._export()), f,
+                        protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+
+    def restore(self, path):
+        """ Replace the entries with a snapshot saved by the same policy
+
+        Entries beyond the limits of this instance are dropped silently,
+        in eviction order. Snapshots are pickles: only load trusted files.
+        """
+        with open(path, "rb") as f:
+            if f.read(len(SNAPSHOT_MAGIC)) != SNAPSHOT_MAGIC:
+                raise ValueError("{} is not a cache snapshot".format(path))
+            name, state = pickle.load(f)
+        if name != type(self).__name__:
+            raise ValueError("cannot restore a {} snapshot into {}".format(
+                name, type(self).__name__))
+
+        for key in list(self.cache_data):
+            self.delete(key)
+        on_evict, self.on_evict = self.on_evict, None
+        try:
+            self._import(state)
+        finally:
+            self.on_evict = on_evict
@@ -0,0 +1,90 @@
+#!/usr/bin/python3
+""" Throughput of get_many / put_many against per-key get / put
+
+Every policy is first checked to leave the same entries after
+put_many as after one put per key.
+
+Usage: ./bench_batch.py [batch_size] [capacity]
+"""
+import random
+import sys
+import time
+
+POLICIES = [
+    __import__('0-basic_cache').BasicCache,
+    __import__('1-fifo_cache').FIFOCache,
+    __import__('2-lifo_cache').LIFOCache,
+    __import__('3-lru_cache').LRUCache,
+    __import__('4-mru_cache').MRUCache,
+    __import__('100-lfu_cache').LFUCache,
+    __import__('101-arc_cache').ARCCache,
+]
+ROUNDS = 2000
+
+
+def per_key(cache, batches):
+    """ Look up then rewrite every batch one key at a time
+    """
+    get, put = cache.get, cache.put
+    for batch in batches:
+        for key in batch:
+            get(key)
+        for key in batch:
+            put(key, key)
+
+
+def batched(cache, batches):
+    """ Look up then rewrite every batch with one call each
+    """
+    for batch in batches:
+        cache.get_many(batch)
+        cache.put_many(dict.fromkeys(batch, 1))
+
+
+def check_put_many(policy, rng):
+    """ Exit when put_many and one put per key leave different entries
+    """
+    batched_cache = policy(4, on_evict=None)
+    per_key_cache = policy(4, on_evict=None)
+    for _ in range(ROUNDS):
+        mapping = {rng.randrange(1, 8): rng.randrange(1, 100)
+                   for _ in range(rng.randrange(1, 5))}
+        batched_cache.put_many(mapping)
+        for key, item in mapping.items():
+            per_key_cache.put(key, item)
+        if dict(batched_cache.cache_data) != dict(per_key_cache.cache_data):
+            sys.exit("{}.put_many({}) left {}, one put per key {}".format(
+                policy.__name__, mapping, dict(batched_cache.cache_data),
+                dict(per_key_cache.cache_data)))
+
+
+def keys_per_sec(policy, capacity, batches, run):
+    """ Keys processed per second by run over a warm cache
+    """
+    cache = policy(capacity, on_evict=None)
+    for key in range(capacity):
+        cache.put(key, key)
+    start = time.perf_counter()
+    run(cache, batches)
+    return sum(map(len, batches)) * 2 / (time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    capacity = int(sys.argv[2]) if len(sys.argv) > 2 else 10000
+    rng = random.Random(0)
+    # mostly hits, with a few keys beyond the capacity to force evictions
+    batches = [[rng.randrange(int(capacity * 1.1)) for _ in range(size)]
+               for _ in range(ROUNDS)]
+
+    for policy in POLICIES:
+        check_put_many(policy, rng)
+
+    print("batch={} capacity={}".format(size, capacity))
+    print("{:>12} {:>14} {:>14} {:>8}".format(
+        "policy", "per-key keys/s", "batch keys/s", "speedup"))
+    for policy in POLICIES:
+        slow = keys_per_sec(policy, capacity, batches, per_key)
+        fast = keys_per_sec(policy, capacity, batches, batched)
+        print("{:>12} {:>14,.0f} {:>14,.0f} {:>7.2f}x".format(
+            policy.__name__, slow, fast, fast / slow))
@@ -0,0 +1,82 @@
+#!/usr/bin/python3
+""" Multi-threaded stress test of ConcurrentCache
+
+Every thread owns its own keys and keeps overwriting them with an
+increasing counter while reading keys of the other threads. Once all
+threads are done, each key must hold the last value its owner wrote and
+every segment must still be a consistent list.
+
+Usage: ./bench_concurrent.py [threads] [ops_per_thread]
+"""
+import sys
+import threading
+import time
+
+ConcurrentCache = __import__('concurrent_caching').ConcurrentCache
+POLICIES = [
+    __import__('0-basic_cache').BasicCache,
+    __import__('1-fifo_cache').FIFOCache,
+    __import__('2-lifo_cache').LIFOCache,
+    __import__('3-lru_cache').LRUCache,
+    __import__('4-mru_cache').MRUCache,
+]
+KEYS_PER_THREAD = 256
+
+
+def worker(cache, owner, threads, ops, last):
+    """ Overwrite the keys of owner and read the keys of the others
+    """
+    for n in range(1, ops + 1):
+        key = (owner, n % KEYS_PER_THREAD)
+        cache.put(key, n)
+        last[key] = n
+        cache.get(((owner + n) % threads, n % KEYS_PER_THREAD))
+
+
+def check(cache, last):
+    """ Return the number of lost or corrupted updates
+    """
+    lost = sum(1 for key, n in last.items() if cache.get(key) != n)
+    for segment in cache._segments:
+        root = getattr(segment, '_root', None)
+        if root is None:
+            continue
+        count, node = 0, root.next
+        while node is not root:
+            count += 1
+            node = node.next
+        lost += abs(count - len(segment.cache_data))
+    return lost
+
+
+def run(policy, threads, ops, segments):
+    """ Hammer one cache and return (ops/sec, lost updates)
+    """
+    cache = ConcurrentCache(policy, segments,
+                            max_items=threads * KEYS_PER_THREAD * 2)
+    last = {}
+    pool = [threading.Thread(target=worker,
+                             args=(cache, owner, threads, ops, last))
+            for owner in range(threads)]
+    start = time.perf_counter()
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    return threads * ops * 2 / elapsed, check(cache, last)
+
+
+if __name__ == "__main__":
+    threads = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    ops = int(sys.argv[2]) if len(sys.argv) > 2 else 100000
+    sys.setswitchinterval(1e-5)
+
+    print("{:>12} {:>9} {:>14} {:>6}".format(
+        "policy", "segments", "ops/s", "lost"))
+    for policy in POLICIES:
+        # one segment is the single global lock baseline
+        for segments in (1, 16):
+            rate, lost = run(policy, threads, ops, segments)
+            print("{:>12} {:>9} {:>14,.0f} {:>6}".format(
+                policy.__name__, segments, rate, lost))
@@ -0,0 +1,146 @@
+#!/usr/bin/python3
+""" Compare the linked-list engine against the former OrderedDict caches
+
+Usage: ./bench_engine.py [size ...]   (defaults to 10k, 1M and 10M keys)
+"""
+import contextlib
+import os
+import sys
+import time
+import tracemalloc
+from collections import OrderedDict
+
+BaseCaching = __import__('base_caching').BaseCaching
+LRUCache = __import__('3-lru_cache').LRUCache
+MRUCache = __import__('4-mru_cache').MRUCache
+
+
+class OldLRUCache(BaseCaching):
+    """ LRUCache as it was before the linked-list engine
+    """
+
+    def __init__(self):
+        """ Initiliaze
+        """
+        super().__init__()
+        self.lru_order = OrderedDict()
+
+    def put(self, key, item):
+        """ Add an item in the cache
+        """
+        if key and item:
+            self.lru_order[key] = item
+            self.lru_order.move_to_end(key)
+            self.cache_data[key] = item
+
+        if len(self.cache_data) > BaseCaching.MAX_ITEMS:
+            item_discarded = next(iter(self.lru_order))
+            del self.cache_data[item_discarded]
+            print("DISCARD:", item_discarded)
+
+        if len(self.lru_order) > BaseCaching.MAX_ITEMS:
+            self.lru_order.popitem(last=False)
+
+    def get(self, key):
+        """ Get an item by key
+        """
+        if key in self.cache_data:
+            self.lru_order.move_to_end(key)
+            return self.cache_data[key]
+        return None
+
+
+class OldMRUCache(BaseCaching):
+    """ MRUCache as it was before the linked-list engine
+    """
+
+    def __init__(self):
+        """ Initiliaze
+        """
+        super().__init__()
+        self.mru_order = OrderedDict()
+
+    def put(self, key, item):
+        """ Add an item in the cache
+        """
+        if not key or not item:
+            return
+
+        self.cache_data[key] = item
+        self.mru_order[key] = item
+
+        if len(self.cache_data) > BaseCaching.MAX_ITEMS:
+            item_discarded = next(iter(self.mru_order))
+            del self.cache_data[item_discarded]
+            print("DISCARD:", item_discarded)
+
+        if len(self.mru_order) > BaseCaching.MAX_ITEMS:
+            self.mru_order.popitem(last=False)
+
+        self.mru_order.move_to_end(key, False)
+
+    def get(self, key):
+        """ Get an item by key
+        """
+        if key in self.cache_data:
+            self.mru_order.move_to_end(key, False)
+            return self.cache_data[key]
+        return None
+
+
+def run(cache_class, keys):
+    """ Fill the cache to capacity, read every key back, then overflow it
+    by a tenth so the eviction path is measured too
+    """
+    cache = cache_class()
+    results = {}
+    extra = ["x{}".format(i) for i in range(len(keys) // 10)]
+
+    start = time.perf_counter()
+    for key in keys:
+        cache.put(key, key)
+    results['put'] = len(keys) / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for key in keys:
+        cache.get(key)
+    results['get'] = len(keys) / (time.perf_counter() - start)
+
+    with open(os.devnull, 'w') as sink, contextlib.redirect_stdout(sink):
+        start = time.perf_counter()
+        for key in extra:
+            cache.put(key, key)
+        results['evict'] = len(extra) / (time.perf_counter() - start)
+    return results
+
+
+def bytes_per_entry(cache_class, keys):
+    """ Memory allocated by the cache structures for each stored entry
+    """
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    cache = cache_class()
+    for key in keys:
+        cache.put(key, key)
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del cache
+    return used / len(keys)
+
+
+if __name__ == "__main__":
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10000, 1000000, 10000000]
+    pairs = [("LRU", OldLRUCache, LRUCache), ("MRU", OldMRUCache, MRUCache)]
+
+    print("{:>10} {:>4} {:>10} {:>12} {:>12} {:>12} {:>10}".format(
+        "keys", "", "impl", "put/s", "get/s", "evict/s", "B/entry"))
+    for size in sizes:
+        BaseCaching.MAX_ITEMS = size
+        keys = ["k{}".format(i) for i in range(size)]
+        for name, old, new in pairs:
+            for label, cache_class in (("old", old), ("engine", new)):
+                ops = run(cache_class, keys)
+                mem = bytes_per_entry(cache_class, keys)
+                print("{:>10} {:>4} {:>10} {:>12,.0f} {:>12,.0f} {:>12,.0f}"
+                      " {:>10.1f}".format(size, name, label, ops['put'],
+                                          ops['get'], ops['evict'], mem))
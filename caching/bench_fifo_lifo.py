@@ -0,0 +1,94 @@
+#!/usr/bin/python3
+""" Per-operation latency of FIFOCache and LIFOCache as capacity grows
+
+The list-based classes they replaced are kept here as the baseline:
+list.pop(0) and list.remove(key) made a full cache O(n) per put. With
+the linked-list engine the latency must stay flat from 1k to 1M keys.
+
+Usage: ./bench_fifo_lifo.py [size ...]   (defaults to 1k, 10k, 100k, 1M)
+"""
+import random
+import sys
+import time
+
+BaseCaching = __import__('base_caching').BaseCaching
+FIFOCache = __import__('1-fifo_cache').FIFOCache
+LIFOCache = __import__('2-lifo_cache').LIFOCache
+OPS = 20000
+
+
+class ListFIFOCache(BaseCaching):
+    """ FIFOCache as it was before the linked-list engine
+    """
+
+    def __init__(self, *args, **kwargs):
+        """ Initiliaze
+        """
+        super().__init__(*args, **kwargs)
+        self.key_indexes = []
+
+    def put(self, key, item):
+        """ Add an item in the cache
+        """
+        if key in self.cache_data:
+            self.cache_data[key] = item
+            return
+        if self.is_full():
+            del self.cache_data[self.key_indexes.pop(0)]
+        self.cache_data[key] = item
+        self.key_indexes.append(key)
+
+    def get(self, key):
+        """ Get an item by key
+        """
+        return self.cache_data.get(key)
+
+
+class ListLIFOCache(ListFIFOCache):
+    """ LIFOCache as it was before the linked-list engine
+    """
+
+    def put(self, key, item):
+        """ Add an item in the cache
+        """
+        if key in self.cache_data:
+            del self.cache_data[key]
+            self.key_indexes.remove(key)
+        elif self.is_full():
+            del self.cache_data[self.key_indexes.pop()]
+        self.cache_data[key] = item
+        self.key_indexes.append(key)
+
+
+def latency(cache_class, size):
+    """ Mean microseconds per operation on a full cache, for a mix of
+    new keys, updates of old keys and reads
+    """
+    cache = cache_class(size, on_evict=None)
+    for key in range(size):
+        cache.put(key, key)
+    rng = random.Random(size)
+    ops = [(rng.random(), rng.randrange(size // 2)) for _ in range(OPS)]
+
+    start = time.perf_counter()
+    for n, (draw, key) in enumerate(ops):
+        if draw < 0.4:
+            cache.put(size + n, n)
+        elif draw < 0.7:
+            cache.put(key, n)
+        else:
+            cache.get(key)
+    elapsed = time.perf_counter() - start
+    return elapsed / OPS * 1e6
+
+
+if __name__ == "__main__":
+    sizes = [int(arg) for arg in sys.argv[1:]] or [1000, 10000, 100000,
+                                                   1000000]
+    classes = [ListFIFOCache, FIFOCache, ListLIFOCache, LIFOCache]
+    print("{:>9} ".format("keys") +
+          " ".join("{:>14}".format(c.__name__) for c in classes))
+    for size in sizes:
+        print("{:>9} ".format(size) +
+              " ".join("{:>12.2f}us".format(latency(c, size))
+                       for c in classes))
@@ -0,0 +1,65 @@
+#!/usr/bin/python3
+""" Replay a Zipf-distributed trace through LFUCache and LRUCache
+
+A get that misses is followed by a put, as a read-through cache would.
+
+Usage: ./bench_lfu.py [capacity] [requests] [keys] [zipf_exponent]
+"""
+import contextlib
+import itertools
+import os
+import random
+import sys
+import time
+
+LRUCache = __import__('3-lru_cache').LRUCache
+LFUCache = __import__('100-lfu_cache').LFUCache
+
+
+def zipf_trace(keys, requests, exponent, seed=0):
+    """ requests keys drawn from 1..keys with P(k) ~ 1 / k ** exponent
+    """
+    rng = random.Random(seed)
+    weights = list(itertools.accumulate(
+        1 / rank ** exponent for rank in range(1, keys + 1)))
+    ranks = rng.choices(range(1, keys + 1), cum_weights=weights, k=requests)
+    # shuffle the ranks over the key space so hot keys are not adjacent
+    names = list(range(1, keys + 1))
+    rng.shuffle(names)
+    return [names[rank - 1] for rank in ranks]
+
+
+def replay(cache, trace):
+    """ Return (hit ratio, ops/sec) of cache over trace
+    """
+    hits = 0
+    with open(os.devnull, 'w') as sink, contextlib.redirect_stdout(sink):
+        start = time.perf_counter()
+        for key in trace:
+            if cache.get(key) is None:
+                cache.put(key, key)
+            else:
+                hits += 1
+        elapsed = time.perf_counter() - start
+    return hits / len(trace), len(trace) / elapsed
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:] + [None] * 4
+    capacity = int(args[0] or 1000)
+    requests = int(args[1] or 1000000)
+    keys = int(args[2] or 100000)
+    exponent = float(args[3] or 0.9)
+    trace = zipf_trace(keys, requests, exponent)
+
+    caches = [
+        ("LRUCache", LRUCache(capacity)),
+        ("LFUCache", LFUCache(capacity)),
+        ("LFUCache aged", LFUCache(capacity, decay_every=capacity * 10)),
+    ]
+    print("capacity={} requests={} keys={} s={}".format(
+        capacity, requests, keys, exponent))
+    print("{:>14} {:>10} {:>12}".format("policy", "hit ratio", "ops/s"))
+    for name, cache in caches:
+        ratio, rate = replay(cache, trace)
+        print("{:>14} {:>10.2%} {:>12,.0f}".format(name, ratio, rate))
@@ -0,0 +1,38 @@
+#!/usr/bin/python3
+""" Time snapshot() and restore() of a full cache
+
+Usage: ./bench_snapshot.py [entries] [path]
+"""
+import os
+import sys
+import time
+
+POLICIES = [
+    __import__('3-lru_cache').LRUCache,
+    __import__('100-lfu_cache').LFUCache,
+    __import__('101-arc_cache').ARCCache,
+]
+
+
+if __name__ == "__main__":
+    entries = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    path = sys.argv[2] if len(sys.argv) > 2 else "cache.snapshot"
+
+    print("{:>10} {:>10} {:>10} {:>12} {:>10}".format(
+        "policy", "entries", "save s", "restore s", "MB"))
+    for policy in POLICIES:
+        cache = policy(entries, on_evict=None)
+        cache.put_many({"user:{}".format(n): n + 1 for n in range(entries)})
+        start = time.perf_counter()
+        cache.snapshot(path)
+        saved = time.perf_counter() - start
+
+        warm = policy(entries, on_evict=None)
+        start = time.perf_counter()
+        warm.restore(path)
+        restored = time.perf_counter() - start
+        assert len(warm.cache_data) == entries
+        print("{:>10} {:>10} {:>10.2f} {:>12.2f} {:>10.1f}".format(
+            policy.__name__, entries, saved, restored,
+            os.path.getsize(path) / 1e6))
+        os.remove(path)
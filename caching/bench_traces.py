@@ -0,0 +1,60 @@
+#!/usr/bin/python3
+""" Trace-driven hit ratio comparison of the caching policies
+
+Each trace file holds one key per line, e.g. the user ids read by the
+API in production order. Every get that misses is followed by a put, as
+a read-through cache would. Without trace files, a synthetic trace of
+Zipf-distributed reads interrupted by full scans of the key space (the
+pattern of view_all_users) is replayed instead.
+
+Usage: ./bench_traces.py [-c capacity] [trace_file ...]
+"""
+import sys
+
+bench_lfu = __import__('bench_lfu')
+POLICIES = [
+    __import__('1-fifo_cache').FIFOCache,
+    __import__('2-lifo_cache').LIFOCache,
+    __import__('3-lru_cache').LRUCache,
+    __import__('4-mru_cache').MRUCache,
+    __import__('100-lfu_cache').LFUCache,
+    __import__('101-arc_cache').ARCCache,
+]
+
+
+def read_trace(path):
+    """ Keys of a trace file, one per line, blank lines ignored
+    """
+    with open(path) as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def scan_trace(keys=20000, requests=200000, scans=5, seed=0):
+    """ Zipf reads with a scan over every key at regular intervals
+    """
+    trace = bench_lfu.zipf_trace(keys, requests, 0.9, seed)
+    step = requests // (scans + 1)
+    for n in range(scans, 0, -1):
+        trace[n * step:n * step] = range(1, keys + 1)
+    return trace
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    capacity = 1000
+    if args[:1] == ['-c']:
+        capacity = int(args[1])
+        args = args[2:]
+    traces = [(path, read_trace(path)) for path in args]
+    if not traces:
+        traces = [("zipf+scans", scan_trace())]
+
+    names = [policy.__name__ for policy in POLICIES]
+    print("capacity={}".format(capacity))
+    print("{:>20} ".format("trace") +
+          " ".join("{:>10}".format(name) for name in names))
+    for label, trace in traces:
+        ratios = [bench_lfu.replay(policy(capacity), trace)[0]
+                  for policy in POLICIES]
+        print("{:>20} ".format(label[-20:]) +
+              " ".join("{:>10.2%}".format(ratio) for ratio in ratios))
@@ -0,0 +1,162 @@
+#!/usr/bin/python3
+""" ConcurrentCache module
+"""
+import sys
+import threading
+import zlib
+from collections import ChainMap
+
+base_caching = __import__('base_caching')
+BaseCaching = base_caching.BaseCaching
+
+
+def stable_hash(key):
+    """ Hash of key that is the same in every process
+
+    hash() of str and bytes changes with PYTHONHASHSEED, so a snapshot
+    restored in another process would find its keys in other segments.
+    Text, bytes and tuples of them go through crc32 instead; numbers
+    keep hash(), which is not randomized and equal for 1, 1.0 and True.
+    """
+    if isinstance(key, str):
+        return zlib.crc32(key.encode('utf-8', 'surrogatepass'))
+    if isinstance(key, bytes):
+        return zlib.crc32(key)
+    if isinstance(key, tuple):
+        value = len(key)
+        for part in key:
+            value = (value * 1000003 ^ stable_hash(part)) & 0xffffffff
+        return value
+    return hash(key)
+
+
+class ConcurrentCache(BaseCaching):
+    """ ConcurrentCache makes any caching policy thread-safe:
+      - keys are sharded by hash over independent segments
+      - every segment is a policy instance guarded by its own lock
+    Threads working on different segments never wait on each other.
+    The limits are split between the segments, the first ones taking
+    the remainder, so the segments add up to the configured limits and
+    eviction is decided per segment.
+    """
+
+    def __init__(self, policy, segments=16, max_items=None, max_bytes=None,
+                 sizer=sys.getsizeof, on_evict=base_caching.discard,
+                 track_latency=False):
+        """ Initiliaze
+
+        policy is the BaseCaching subclass used for every segment.
+        """
+        super().__init__(max_items, max_bytes, sizer, on_evict, track_latency)
+        segments = max(1, min(segments, self.max_items))
+
+        self._segments = []
+        for index in range(segments):
+            items = self._share(self.max_items, segments, index)
+            budget = None
+            if max_bytes is not None:
+                budget = self._share(max_bytes, segments, index)
+            self._segments.append(policy(items, budget, sizer, on_evict))
+        self._locks = [threading.Lock() for _ in range(segments)]
+        self.cache_data = ChainMap(*[segment.cache_data
+                                     for segment in self._segments])
+
+    @staticmethod
+    def _share(total, segments, index):
+        """ Part of total given to segment index
+        """
+        return total // segments + (index < total % segments)
+
+    def _shard(self, key):
+        """ Index of the segment owning key
+        """
+        return stable_hash(key) % len(self._segments)
+
+    def print_cache(self):
+        """ Print the cache
+        """
+        for lock in self._locks:
+            lock.acquire()
+        try:
+            super().print_cache()
+        finally:
+            for lock in self._locks:
+                lock.release()
+
+    def stats(self):
+        """ Sum of the segment counters
+        """
+        snapshot = dict.fromkeys(self.COUNTERS + ('items', 'bytes'), 0)
+        for index, segment in enumerate(self._segments):
+            with self._locks[index]:
+                part = segment.stats()
+            for name in snapshot:
+                snapshot[name] += part[name]
+        snapshot['latency'] = self.latency_stats()
+        return snapshot
+
+    def _export(self):
+        """ State of every segment
+        """
+        state = []
+        for index, segment in enumerate(self._segments):
+            with self._locks[index]:
+                state.append(segment._export())
+        return state
+
+    def _import(self, state):
+        """ Restore every segment from its own state
+        """
+        if len(state) != len(self._segments):
+            raise ValueError("snapshot has {} segments, not {}".format(
+                len(state), len(self._segments)))
+        for index, segment in enumerate(self._segments):
+            with self._locks[index]:
+                on_evict, segment.on_evict = segment.on_evict, None
+                try:
+                    segment._import(state[index])
+                finally:
+                    segment.on_evict = on_evict
+
+    def put(self, key, item):
+        """ Add an item in the cache
+        """
+        index = self._shard(key)
+        with self._locks[index]:
+            self._segments[index].put(key, item)
+
+    def get(self, key):
+        """ Get an item by key
+        """
+        index = self._shard(key)
+        with self._locks[index]:
+            return self._segments[index].get(key)
+
+    def get_many(self, keys):
+        """ Get the items of several keys, locking each segment once
+        """
+        shards = {}
+        for key in keys:
+            shards.setdefault(self._shard(key), []).append(key)
+        found = {}
+        for index, part in shards.items():
+            with self._locks[index]:
+                found.update(self._segments[index].get_many(part))
+        return found
+
+    def put_many(self, mapping):
+        """ Add every item of mapping, locking each segment once
+        """
+        shards = {}
+        for key, item in mapping.items():
+            shards.setdefault(self._shard(key), {})[key] = item
+        for index, part in shards.items():
+            with self._locks[index]:
+                self._segments[index].put_many(part)
+
+    def delete(self, key):
+        """ Remove an item by key, if present
+        """
+        index = self._shard(key)
+        with self._locks[index]:
+            self._segments[index].delete(key)
@@ -0,0 +1,218 @@
+#!/usr/bin/python3
+""" ExpiringCache module
+"""
+import heapq
+import itertools
+import sys
+import threading
+import time
+
+base_caching = __import__('base_caching')
+BaseCaching = base_caching.BaseCaching
+
+
+class ExpiringCache(BaseCaching):
+    """ ExpiringCache adds time-to-live to any caching policy:
+      - every entry may carry a deadline, given per put or by default
+      - expired entries are dropped lazily when they are read
+      - deadlines sit in a min-heap, so expiring the due ones costs
+        O(log n) each instead of a scan of the whole cache
+    The wrapped policy still decides what to evict when the cache is
+    full. sweep() runs on every put, and start_sweeper() runs it from a
+    background thread as well.
+    """
+
+    def __init__(self, policy, ttl=None, max_items=None, max_bytes=None,
+                 sizer=sys.getsizeof, on_evict=base_caching.discard,
+                 track_latency=False, clock=time.monotonic):
+        """ Initiliaze
+
+        policy is the BaseCaching subclass holding the entries, ttl the
+        default lifetime in seconds (None never expires). Expired entries
+        are counted in stats() but not reported to on_evict.
+        """
+        super().__init__(max_items, max_bytes, sizer, on_evict, track_latency)
+        self._cache = policy(max_items, max_bytes, sizer, self._evicted)
+        self.cache_data = self._cache.cache_data
+        self.ttl = ttl
+        self.clock = clock
+        self._deadlines = {}
+        self._heap = []
+        self._order = itertools.count()
+        self._lock = threading.RLock()
+        self._stop = None
+        self.expirations = 0
+
+    def _evicted(self, key, item):
+        """ Forget the deadline of an entry the policy evicted, then
+        notify the on_evict callback
+        """
+        self._deadlines.pop(key, None)
+        if self.on_evict is not None:
+            self.on_evict(key, item)
+
+    def _compact(self):
+        """ Rebuild the heap from the live deadlines once stale entries,
+        left by keys put again or evicted, outnumber them
+        """
+        if len(self._heap) <= 2 * len(self._deadlines) + 64:
+            return
+        self._heap = [(deadline, next(self._order), key)
+                      for key, deadline in self._deadlines.items()]
+        heapq.heapify(self._heap)
+
+    def sweep(self):
+        """ Drop every entry whose deadline has passed
+        """
+        with self._lock:
+            now = self.clock()
+            heap = self._heap
+            while heap and heap[0][0] <= now:
+                deadline, _, key = heapq.heappop(heap)
+                # an entry put again since then has a newer deadline
+                if self._deadlines.get(key) == deadline:
+                    del self._deadlines[key]
+                    if key in self._cache.cache_data:
+                        self.expirations += 1
+                        self._cache.delete(key)
+
+    def start_sweeper(self, interval=1.0):
+        """ Sweep expired entries every interval seconds in a thread
+        """
+        if self._stop is not None:
+            return
+        self._stop = threading.Event()
+        stop = self._stop
+
+        def run():
+            """ Sweep until stop_sweeper is called
+            """
+            while not stop.wait(interval):
+                self.sweep()
+
+        threading.Thread(target=run, name="cache-sweeper",
+                         daemon=True).start()
+
+    def stop_sweeper(self):
+        """ Stop the background sweeper, if running
+        """
+        if self._stop is not None:
+            self._stop.set()
+            self._stop = None
+
+    def print_cache(self):
+        """ Print the entries that have not expired
+        """
+        with self._lock:
+            self.sweep()
+            super().print_cache()
+
+    def stats(self):
+        """ Counters of the wrapped policy, plus expirations
+        """
+        with self._lock:
+            snapshot = self._cache.stats()
+            snapshot['misses'] += self.misses
+            snapshot['expirations'] = self.expirations
+            snapshot['latency'] = self.latency_stats()
+        return snapshot
+
+    def _expire(self, keys, ttl):
+        """ Set the deadline of freshly put keys
+        """
+        ttl = self.ttl if ttl is None else ttl
+        deadline = None if ttl is None else self.clock() + ttl
+        for key in keys:
+            if deadline is None or key not in self._cache.cache_data:
+                self._deadlines.pop(key, None)
+                continue
+            self._deadlines[key] = deadline
+            heapq.heappush(self._heap, (deadline, next(self._order), key))
+        self._compact()
+
+    def _expired(self, key, now):
+        """ Drop key if its deadline has passed and tell whether it did
+        """
+        deadline = self._deadlines.get(key)
+        if deadline is None or deadline > now:
+            return False
+        del self._deadlines[key]
+        if key in self._cache.cache_data:
+            self.expirations += 1
+            self._cache.delete(key)
+        self.misses += 1
+        return True
+
+    def _export(self):
+        """ State of the wrapped policy with the wall-clock deadlines
+        """
+        with self._lock:
+            self.sweep()
+            offset = time.time() - self.clock()
+            deadlines = {key: deadline + offset
+                         for key, deadline in self._deadlines.items()}
+            return (type(self._cache).__name__, self._cache._export(),
+                    deadlines)
+
+    def _import(self, state):
+        """ Restore the wrapped policy, dropping the expired entries
+        """
+        name, inner, deadlines = state
+        if name != type(self._cache).__name__:
+            raise ValueError("cannot restore a {} snapshot into {}".format(
+                name, type(self._cache).__name__))
+        with self._lock:
+            on_evict, self._cache.on_evict = self._cache.on_evict, None
+            try:
+                self._cache._import(inner)
+            finally:
+                self._cache.on_evict = on_evict
+            offset = self.clock() - time.time()
+            for key, deadline in deadlines.items():
+                if key in self._cache.cache_data:
+                    deadline += offset
+                    self._deadlines[key] = deadline
+                    heapq.heappush(self._heap,
+                                   (deadline, next(self._order), key))
+            self.sweep()
+
+    def put(self, key, item, ttl=None):
+        """ Add an item in the cache, expiring after ttl seconds
+        """
+        if not key or not item:
+            return
+        with self._lock:
+            self.sweep()
+            self._cache.put(key, item)
+            self._expire((key,), ttl)
+
+    def put_many(self, mapping, ttl=None):
+        """ Add every item of mapping, expiring after ttl seconds
+        """
+        with self._lock:
+            self.sweep()
+            self._cache.put_many(mapping)
+            self._expire(mapping, ttl)
+
+    def get(self, key):
+        """ Get an item by key, None once it has expired
+        """
+        with self._lock:
+            if self._expired(key, self.clock()):
+                return None
+            return self._cache.get(key)
+
+    def get_many(self, keys):
+        """ Get the items of several keys that have not expired
+        """
+        with self._lock:
+            now = self.clock()
+            live = [key for key in keys if not self._expired(key, now)]
+            return self._cache.get_many(live)
+
+    def delete(self, key):
+        """ Remove an item by key, if present
+        """
+        with self._lock:
+            self._deadlines.pop(key, None)
+            self._cache.delete(key)
@@ -0,0 +1,320 @@
+#!/usr/bin/python3
+""" LinkedCaching module
+"""
+from collections.abc import Mapping
+
+BaseCaching = __import__('base_caching').BaseCaching
+
+
+class _Node():
+    """ Intrusive list node holding one cache entry. Without a byte
+    budget every entry costs 0 bytes, so the size slot is left out
+    """
+    __slots__ = ('prev', 'next', 'key', 'item')
+    size = 0
+
+    def __init__(self, key=None, item=None):
+        """ Initiliaze
+        """
+        self.prev = self.next = self
+        self.key = key
+        self.item = item
+
+
+class _SizedNode(_Node):
+    """ List node of a cache with a byte budget, charged size bytes
+    """
+    __slots__ = ('size',)
+
+    def __init__(self, key=None, item=None, size=0):
+        """ Initiliaze
+        """
+        super().__init__(key, item)
+        self.size = size
+
+
+def _link_back(root, node):
+    """ Link node just before root (the most recent end of the ring)
+    """
+    last = root.prev
+    node.prev = last
+    node.next = root
+    last.next = root.prev = node
+
+
+def _unlink(node):
+    """ Remove node from the ring it belongs to
+    """
+    node.prev.next = node.next
+    node.next.prev = node.prev
+
+
+class _ItemView(Mapping):
+    """ Read-only key -> item view over the node table, so cache_data
+    keeps its meaning without storing a second reference per entry
+    """
+    __slots__ = ('_nodes',)
+
+    def __init__(self, nodes):
+        """ Initiliaze
+        """
+        self._nodes = nodes
+
+    def __getitem__(self, key):
+        """ Item stored under key
+        """
+        return self._nodes[key].item
+
+    def __contains__(self, key):
+        """ Membership test without touching the node
+        """
+        return key in self._nodes
+
+    def __iter__(self):
+        """ Iterate over the keys
+        """
+        return iter(self._nodes)
+
+    def __len__(self):
+        """ Number of entries
+        """
+        return len(self._nodes)
+
+
+class LinkedCaching(BaseCaching):
+    """ LinkedCaching defines the engine shared by ordered policies:
+      - one dict mapping each key to its list node
+      - one circular doubly-linked list, oldest first (root.next)
+        and most recent last (root.prev)
+    Policies only choose the node to evict when the cache is full.
+    """
+
+    def __init__(self, *args, **kwargs):
+        """ Initiliaze
+        """
+        super().__init__(*args, **kwargs)
+        self._nodes = {}
+        self._root = _Node()
+        self.cache_data = _ItemView(self._nodes)
+
+    def _victim(self, keep=None):
+        """ Node to discard to make room for a new key, other than keep
+        """
+        raise NotImplementedError(
+            "_victim must be implemented in your cache class")
+
+    def _touch_many(self, nodes):
+        """ Record a read of every node, in order: the engine moves
+        each of them to the most recent end of the ring
+        """
+        root = self._root
+        for node in nodes:
+            node.prev.next = node.next
+            node.next.prev = node.prev
+            last = root.prev
+            node.prev = last
+            node.next = root
+            last.next = root.prev = node
+
+    def _requeue_many(self, nodes):
+        """ Reorder nodes whose items put_many replaced in place
+        """
+        self._touch_many(nodes)
+
+    def _remove(self, node):
+        """ Drop node from the cache
+        """
+        _unlink(node)
+        del self._nodes[node.key]
+        self.used_bytes -= node.size
+
+    def _discard(self, node):
+        """ Evict node from the cache
+        """
+        self._remove(node)
+        self.evicted(node.key, node.item)
+
+    def _update(self, node, item, size):
+        """ Replace the item of node in place, keeping its position.
+        Other entries are evicted if the new item breaks the byte
+        budget; returns False when the item is too big to be cached.
+        """
+        if self.max_bytes is None:
+            node.item = item
+            return True
+        self.used_bytes -= node.size
+        node.size = 0
+        if not self.fits(size):
+            self._remove(node)
+            return False
+        while (self.max_bytes is not None and
+               self.used_bytes + size > self.max_bytes):
+            self._discard(self._victim(node))
+        node.item = item
+        node.size = size
+        self.used_bytes += size
+        return True
+
+    def put(self, key, item):
+        """ Add an item in the cache
+        """
+        if not key or not item:
+            return
+        if self.max_bytes is not None:
+            self._put_sized(key, item)
+            return
+
+        # no byte budget: an update never evicts, so it only replaces
+        # the item and moves the node; the list operations are inlined
+        # as in get since put is as hot
+        nodes = self._nodes
+        root = self._root
+        node = nodes.get(key)
+        if node is None:
+            if self.max_items <= 0:
+                return
+            while len(nodes) >= self.max_items:
+                self._discard(self._victim())
+            node = nodes[key] = _Node(key, item)
+            self.inserts += 1
+        else:
+            node.item = item
+            node.prev.next = node.next
+            node.next.prev = node.prev
+        last = root.prev
+        node.prev = last
+        node.next = root
+        last.next = root.prev = node
+
+    def _put_sized(self, key, item):
+        """ put under a byte budget
+        """
+        size = self.item_size(item)
+        # an update is a removal followed by a fresh insertion, so the
+        # old entry never counts against the limits nor becomes a victim
+        node = self._nodes.pop(key, None)
+        if node is not None:
+            _unlink(node)
+            self.used_bytes -= node.size
+        if not self.fits(size):
+            return
+
+        while self.is_full(size):
+            self._discard(self._victim())
+
+        if node is None:
+            node = _SizedNode(key, item, size)
+            self.inserts += 1
+        else:
+            node.item = item
+            node.size = size
+        self._nodes[key] = node
+        self.used_bytes += size
+        _link_back(self._root, node)
+
+    def get(self, key):
+        """ Get an item by key
+        """
+        node = self._nodes.get(key)
+        if node is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        root = self._root
+        if node.next is not root:
+            # inlined _touch_many: get is the hottest path
+            node.prev.next = node.next
+            node.next.prev = node.prev
+            last = root.prev
+            node.prev = last
+            node.next = root
+            last.next = root.prev = node
+        return node.item
+
+    def delete(self, key):
+        """ Remove an item by key, if present
+        """
+        node = self._nodes.get(key)
+        if node is not None:
+            self._remove(node)
+
+    def get_many(self, keys):
+        """ Get the items of several keys, as a dict of the keys found.
+        Lookups run first and the recency order is updated once for
+        the whole batch.
+        """
+        nodes = self._nodes
+        found = {}
+        hits = []
+        lookups = 0
+        for key in keys:
+            lookups += 1
+            node = nodes.get(key)
+            if node is not None:
+                found[key] = node.item
+                hits.append(node)
+        self.hits += len(hits)
+        self.misses += lookups - len(hits)
+        self._touch_many(hits)
+        return found
+
+    def put_many(self, mapping):
+        """ Add every item of mapping in the cache. When nothing has to
+        be evicted, keys already cached are updated first, in one
+        reordering pass, then the new keys are inserted in order.
+        Otherwise the keys are put one by one, so an insert never evicts
+        a key the same batch wrote before it.
+        """
+        if self.max_bytes is not None:
+            # every update may evict under a byte budget: go one by one
+            super().put_many(mapping)
+            return
+        nodes = self._nodes
+        pairs = [(key, item) for key, item in mapping.items()
+                 if key and item]
+        fresh = [(key, item) for key, item in pairs if key not in nodes]
+        put = self.put
+        if len(nodes) + len(fresh) > self.max_items:
+            for key, item in pairs:
+                put(key, item)
+            return
+        updated = []
+        for key, item in pairs:
+            node = nodes.get(key)
+            if node is not None:
+                node.item = item
+                updated.append(node)
+        self._requeue_many(updated)
+        for key, item in fresh:
+            put(key, item)
+
+    def _export(self):
+        """ Entries in ring order, oldest first: putting them back in
+        that order rebuilds the same ring
+        """
+        state = []
+        root = self._root
+        node = root.next
+        while node is not root:
+            state.append((node.key, node.item))
+            node = node.next
+        return state
+
+    def _import(self, state):
+        """ Rebuild the ring from _export, then evict silently what
+        exceeds the limits of this instance
+        """
+        nodes = self._nodes
+        root = self._root
+        item_size = self.item_size
+        sized = self.max_bytes is not None
+        for key, item in state:
+            if sized:
+                node = _SizedNode(key, item, item_size(item))
+            else:
+                node = _Node(key, item)
+            nodes[key] = node
+            self.used_bytes += node.size
+            _link_back(root, node)
+        while self.over_limits():
+            self._remove(self._victim())
@@ -0,0 +1,87 @@
+#!/usr/bin/python3
+""" Memoization on top of the caching policies
+"""
+import sys
+import threading
+from functools import wraps
+
+LRUCache = __import__('3-lru_cache').LRUCache
+ExpiringCache = __import__('expiring_caching').ExpiringCache
+
+
+def make_key(args, kwargs):
+    """ Hashable cache key of a call; keyword order does not matter
+    """
+    return (args, tuple(sorted(kwargs.items())))
+
+
+def cached(policy=LRUCache, maxsize=128, ttl=None, max_bytes=None,
+           sizer=sys.getsizeof, key=make_key):
+    """ Memoize a function in a cache of the given policy
+
+    Results are kept for ttl seconds (forever when None) and every
+    argument must be hashable. The decorated function gains:
+      - cache: the BaseCaching instance holding the results
+      - stats(): hits, misses, evictions... of that cache
+      - invalidate(*args, **kwargs): forget the result of one call
+      - cache_clear(): forget every result and reset the counters
+    Methods work too, the instance being part of the key.
+    """
+    def decorator(fn):
+        """ Wrap fn with its own cache
+        """
+        lock = threading.Lock()
+
+        def boxed_size(box):
+            """ Size of the result held in box
+            """
+            return sizer(box[0])
+
+        def new_cache():
+            """ Empty cache configured for fn
+            """
+            if ttl is None:
+                return policy(maxsize, max_bytes, boxed_size, None)
+            return ExpiringCache(policy, ttl, maxsize, max_bytes,
+                                 boxed_size, None)
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            """ Return the cached result of the call, computing it once
+            """
+            call = key(args, kwargs)
+            with lock:
+                # results are boxed so falsy ones can be cached too
+                boxed = wrapper.cache.get(call)
+            if boxed is not None:
+                return boxed[0]
+            result = fn(*args, **kwargs)
+            with lock:
+                wrapper.cache.put(call, (result,))
+            return result
+
+        def stats():
+            """ Counters of the cache of fn
+            """
+            with lock:
+                return wrapper.cache.stats()
+
+        def invalidate(*args, **kwargs):
+            """ Forget the cached result of fn(*args, **kwargs)
+            """
+            with lock:
+                wrapper.cache.delete(key(args, kwargs))
+
+        def cache_clear():
+            """ Forget every cached result of fn
+            """
+            with lock:
+                wrapper.cache = new_cache()
+
+        wrapper.cache = new_cache()
+        wrapper.stats = stats
+        wrapper.invalidate = invalidate
+        wrapper.cache_clear = cache_clear
+        return wrapper
+
+    return decorator
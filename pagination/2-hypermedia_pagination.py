@@ -4,19 +4,32 @@ import csv
 from math import ceil
 from typing import List, Tuple, Dict
 
+ColumnarDataset = __import__('columnar_dataset').ColumnarDataset
+
 
 class Server:
     """Server class to paginate a database of popular baby names.
     """
     DATA_FILE = "Popular_Baby_Names.csv"
 
-    def __init__(self):
+    def __init__(self, columnar: bool = False) -> None:
+        """
+            Constructor
+
+            Args:
+                columnar: hold the dataset in a ColumnarDataset, which
+                    builds only the rows of the pages asked for, instead
+                    of a list of lists of str
+        """
+        self.columnar = columnar
         self.__dataset = None
 
     def dataset(self) -> List[List]:
         """Cached dataset
         """
-        if self.__dataset is None:
+        if self.__dataset is None and self.columnar:
+            self.__dataset = ColumnarDataset(self.DATA_FILE)
+        elif self.__dataset is None:
             with open(self.DATA_FILE) as f:
                 reader = csv.reader(f)
                 dataset = [row for row in reader]
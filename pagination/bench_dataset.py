@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+""" Load time, memory and page latency of the two dataset backends
+
+Popular_Baby_Names.csv is used when present, else a file of the same
+shape is generated: rows [year, gender, ethnicity, name, count, rank].
+Each backend loads in a fresh process so the RSS figures do not mix.
+
+Usage: ./bench_dataset.py [rows]   (defaults to 1,000,000 generated rows)
+"""
+import csv
+import os
+import random
+import subprocess
+import sys
+import time
+
+SOURCE = "Popular_Baby_Names.csv"
+ETHNICITIES = ["ASIAN AND PACIFIC ISLANDER", "BLACK NON HISPANIC",
+               "HISPANIC", "WHITE NON HISPANIC", "ASIAN AND PACI",
+               "BLACK NON HISP", "WHITE NON HISP"]
+
+
+def generate(path: str, rows: int) -> None:
+    """ Write a CSV shaped like Popular_Baby_Names.csv """
+    rng = random.Random(0)
+    names = ["".join(rng.choice("abcdefghijklmnopqrstuvwxyz")
+                     for _ in range(rng.randint(3, 9))).title()
+             for _ in range(3000)]
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["Year of Birth", "Gender", "Ethnicity",
+                         "Child's First Name", "Count", "Rank"])
+        for _ in range(rows):
+            writer.writerow([rng.randint(2011, 2016),
+                             rng.choice(["FEMALE", "MALE"]),
+                             rng.choice(ETHNICITIES), rng.choice(names),
+                             rng.randint(10, 300), rng.randint(1, 100)])
+
+
+def rss_kb() -> int:
+    """ Resident set size of this process in KiB """
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") // 1024
+
+
+def measure(path: str, columnar: bool) -> None:
+    """ Load path with one backend and print its figures """
+    server = __import__('2-hypermedia_pagination').Server(columnar)
+    server.DATA_FILE = path
+    before = rss_kb()
+    start = time.perf_counter()
+    rows = len(server.dataset())
+    load = time.perf_counter() - start
+    memory = (rss_kb() - before) / 1024
+
+    pages = rows // 10
+    start = time.perf_counter()
+    for page in range(1, pages + 1, max(1, pages // 10000)):
+        server.get_hyper(page, 10)
+    calls = len(range(1, pages + 1, max(1, pages // 10000)))
+    latency = (time.perf_counter() - start) / calls * 1e6
+    print("{:>13} rows={} load={:6.2f}s rss=+{:7.1f}MiB "
+          "get_hyper={:5.1f}us".format(
+              "columnar" if columnar else "list of lists", rows, load,
+              memory, latency))
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3 and sys.argv[1] in ("list", "columnar"):
+        measure(sys.argv[2], sys.argv[1] == "columnar")
+        sys.exit()
+
+    path = SOURCE
+    if len(sys.argv) > 1 or not os.path.exists(SOURCE):
+        path = "/tmp/bench_dataset.csv"
+        generate(path, int(sys.argv[1]) if len(sys.argv) > 1 else 1000000)
+    for backend in ("list", "columnar"):
+        subprocess.run([sys.executable, __file__, backend, path],
+                       check=True)
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+""" Columnar in-memory dataset """
+import csv
+from array import array
+from typing import Dict, Iterable, List, Sequence, Union
+
+
+class Column:
+    """ Integer column, stored as one array of machine integers """
+
+    def __init__(self) -> None:
+        """ Constructor """
+        self.data = array('q')
+
+    def append(self, value: str) -> bool:
+        """
+            Add a cell
+
+            Args:
+                value: text of the cell
+
+            Return:
+                False, leaving the column unchanged, when value does not
+                read back the same through int
+        """
+        try:
+            number = int(value)
+            if str(number) != value:
+                return False
+            self.data.append(number)
+        except (ValueError, OverflowError):
+            return False
+        return True
+
+    def values(self, start: int, stop: int) -> List[str]:
+        """ Text of the cells start to stop """
+        return [str(value) for value in self.data[start:stop]]
+
+
+class Categorical:
+    """ Text column, every distinct value stored once and coded """
+
+    def __init__(self, values: Iterable[str] = ()) -> None:
+        """
+            Constructor
+
+            Args:
+                values: text of the first cells
+        """
+        self.levels: List[str] = []
+        self._codes: Dict[str, int] = {}
+        self.data = array('L')
+        for value in values:
+            self.append(value)
+
+    def append(self, value: str) -> bool:
+        """ Add a cell, always possible """
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self.levels)
+            self.levels.append(value)
+        self.data.append(code)
+        return True
+
+    def pack(self) -> None:
+        """ Store the codes in the smallest integers that hold them """
+        typecode = 'B' if len(self.levels) <= 0xff else \
+            'H' if len(self.levels) <= 0xffff else 'L'
+        self.data = array(typecode, self.data)
+        self._codes = {}
+
+    def values(self, start: int, stop: int) -> List[str]:
+        """ Text of the cells start to stop """
+        levels = self.levels
+        return [levels[code] for code in self.data[start:stop]]
+
+
+class ColumnarDataset(Sequence):
+    """
+        CSV table held column by column: integer columns in arrays of
+        machine integers, text columns as interned categoricals. Rows
+        are only built, as lists of str like csv.reader gives, for the
+        indexes or slices asked for.
+    """
+
+    def __init__(self, path: str, header: bool = True) -> None:
+        """
+            Constructor
+
+            Args:
+                path: CSV file to load, every row with the same number
+                    of cells
+                header: skip the first line of the file
+        """
+        self.columns: List[Union[Column, Categorical]] = []
+        self._length = 0
+        with open(path) as f:
+            reader = csv.reader(f)
+            if header:
+                next(reader, None)
+            for row in reader:
+                self._append(row)
+        for column in self.columns:
+            if isinstance(column, Categorical):
+                column.pack()
+
+    def _append(self, row: List[str]) -> None:
+        """ Add a row, turning integer columns to text when needed """
+        if not self.columns:
+            self.columns = [Column() for _ in row]
+        if len(row) != len(self.columns):
+            raise ValueError("row {} has {} cells, expected {}".format(
+                self._length, len(row), len(self.columns)))
+        for index, value in enumerate(row):
+            column = self.columns[index]
+            if not column.append(value):
+                column = Categorical(column.values(0, self._length))
+                column.append(value)
+                self.columns[index] = column
+        self._length += 1
+
+    def __len__(self) -> int:
+        """ Number of rows """
+        return self._length
+
+    def rows(self, start: int, stop: int) -> List[List[str]]:
+        """
+            Build rows start to stop
+
+            Args:
+                start: index of the first row
+                stop: index after the last row
+
+            Return:
+                The rows as lists of str
+        """
+        start, stop, _ = slice(start, stop).indices(self._length)
+        columns = [column.values(start, stop) for column in self.columns]
+        return [list(row) for row in zip(*columns)]
+
+    def __getitem__(self, index: Union[int, slice])\
+            -> Union[List[str], List[List[str]]]:
+        """ Row at index, or the rows of a slice """
+        if isinstance(index, slice):
+            if index.step not in (None, 1):
+                return [self[i] for i in range(*index.indices(len(self)))]
+            return self.rows(index.start, index.stop)
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("row index out of range")
+        return self.rows(index, index + 1)[0]